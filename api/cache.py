@@ -0,0 +1,147 @@
+"""
+In-process response cache for hot dashboard endpoints
+
+Entries live for a TTL and are also tied to a data generation (the newest
+log _id): when a new log is written, the next request recomputes even if
+the TTL has not expired. Concurrent misses for the same key share a single
+computation (single-flight), however many callers are waiting.
+
+With a SnapshotStore, misses first look for a response another worker
+process already computed, and only one worker computes a given key at a
+time (see api/snapshots.py).
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from api.snapshots import SnapshotStore
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CacheEntry:
+    value: Any
+    generation: Any
+    expires_at: float
+
+class ResponseCache:
+    """TTL cache with generation-based invalidation and request coalescing"""
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int = 256,
+        shared: Optional[SnapshotStore] = None,
+        shared_wait: float = 10.0
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.shared = shared
+        self.shared_wait = shared_wait
+        self._entries: Dict[Hashable, CacheEntry] = {}
+        self._pending: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    async def get(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]],
+        generation: Optional[Callable[[], Awaitable[Any]]] = None
+    ) -> Any:
+        """Return the cached value for key, computing it at most once at a time"""
+        if not self.enabled:
+            return await compute()
+
+        current = await generation() if generation else None
+        if self.shared is not None:
+            # Invalidations by any worker move the shared epoch
+            current = f"{current}/{self.shared.epoch()}"
+
+        entry = self._entries.get(key)
+        if entry and entry.expires_at > time.monotonic() and entry.generation == current:
+            self.hits += 1
+            return entry.value
+
+        self.misses += 1
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute(key, compute, current))
+            self._pending[key] = task
+
+        # Shielded, so a disconnecting caller does not cancel the others' computation
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]], generation: Any) -> Any:
+        try:
+            if self.shared is not None:
+                value = await self._compute_shared(key, compute, generation)
+            else:
+                value = await compute()
+            self._store(key, value, generation)
+            return value
+        finally:
+            self._pending.pop(key, None)
+
+    async def _compute_shared(self, key: Hashable, compute: Callable[[], Awaitable[Any]], generation: Any) -> Any:
+        """Load another worker's snapshot, or compute and publish one while holding the key's lock"""
+        deadline = time.monotonic() + self.shared_wait
+
+        while True:
+            value = self.shared.get(key, generation)
+            if value is not None:
+                self.shared_hits += 1
+                return value
+
+            lock = self.shared.try_lock(key)
+            if lock is not None:
+                try:
+                    # The previous holder may have published while we were checking
+                    value = self.shared.get(key, generation)
+                    if value is not None:
+                        self.shared_hits += 1
+                        return value
+
+                    value = await compute()
+                    self.shared.put(key, value, generation, self.ttl)
+                    return value
+                finally:
+                    lock.release()
+
+            if time.monotonic() > deadline:
+                # The computing worker is stuck or gone: do not wait forever
+                return await compute()
+
+            await asyncio.sleep(0.05)
+
+    def _store(self, key: Hashable, value: Any, generation: Any) -> None:
+        self._entries.pop(key, None)
+        if len(self._entries) >= self.max_entries:
+            # Entries are kept in insertion order, so the first one is the oldest
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = CacheEntry(value, generation, time.monotonic() + self.ttl)
+
+    def invalidate(self) -> None:
+        """Drop every entry, e.g. after a write through the API"""
+        self._entries.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "ttl": self.ttl,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared.directory if self.shared is not None else None,
+            "shared_hits": self.shared_hits
+        }
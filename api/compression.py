@@ -0,0 +1,190 @@
+"""
+Negotiated response compression
+
+ASGI middleware compressing response bodies with the best encoding the
+client accepts: zstd or brotli when their packages are installed, gzip
+otherwise. Bodies are compressed chunk by chunk as the application sends
+them, so streaming exports stay streamed and are never held in memory.
+
+Left untouched:
+- bodies smaller than minimum_size (known when they arrive in one piece)
+- responses that already carry a Content-Encoding
+- event streams, which must reach the client as each event is written
+- already-compressed content (gzip downloads, images, archives)
+"""
+
+import logging
+import zlib
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Content types never worth compressing again, or that must not be buffered
+SKIPPED_TYPES = (
+    'text/event-stream',
+    'application/gzip',
+    'application/zip',
+    'application/zstd',
+    'image/',
+    'video/',
+    'audio/'
+)
+
+class GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+class ZstdEncoder:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+class BrotliEncoder:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+def available_encoders() -> Dict[str, type]:
+    """Encodings this process can produce, most preferred first"""
+    encoders = {}
+    if zstandard is not None:
+        encoders['zstd'] = ZstdEncoder
+    if brotli is not None:
+        encoders['br'] = BrotliEncoder
+    encoders['gzip'] = GzipEncoder
+    return encoders
+
+def choose_encoding(accept_encoding: str, supported: List[str]) -> Optional[str]:
+    """Pick the supported encoding with the highest q-value, ties going to the server's preference"""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+class CompressionMiddleware:
+    """Compress HTTP responses with zstd, brotli or gzip according to Accept-Encoding"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, levels: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {'gzip': 6, 'zstd': 3, 'br': 4, **(levels or {})}
+        self.encoders = available_encoders()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get('accept-encoding', ''), list(self.encoders))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(send, encoding, self.encoders[encoding], self.levels[encoding], self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+class _CompressingResponder:
+    """Wraps send for one response, deciding at the first body chunk whether to compress"""
+
+    def __init__(self, send: Send, encoding: str, encoder_class: type, level: int, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.encoder_class = encoder_class
+        self.level = level
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.encoder = None
+        self.passthrough = False
+
+    def _compressible(self, headers: Headers) -> bool:
+        if self.start['status'] < 200 or self.start['status'] in (204, 304):
+            return False
+        if 'content-encoding' in headers:
+            return False
+        content_type = headers.get('content-type', '').lower()
+        return not content_type.startswith(SKIPPED_TYPES)
+
+    async def send(self, message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            # Held until the first body chunk shows whether compressing pays off
+            self.start = message
+            return
+
+        if message['type'] != 'http.response.body' or self.passthrough:
+            await self._flush_start()
+            await self._send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if self.encoder is None:
+            headers = MutableHeaders(raw=self.start['headers'])
+            if not self._compressible(headers) or (not more_body and len(body) < self.minimum_size):
+                self.passthrough = True
+                await self._flush_start()
+                await self._send(message)
+                return
+
+            self.encoder = self.encoder_class(self.level)
+            del headers['content-length']
+            headers['content-encoding'] = self.encoding
+            headers.add_vary_header('Accept-Encoding')
+            await self._flush_start()
+
+        data = self.encoder.compress(body)
+        if not more_body:
+            data += self.encoder.finish()
+
+        # Empty intermediate chunks would only cost a write
+        if data or not more_body:
+            await self._send({'type': 'http.response.body', 'body': data, 'more_body': more_body})
+
+    async def _flush_start(self) -> None:
+        if self.start is not None:
+            start, self.start = self.start, None
+            await self._send(start)
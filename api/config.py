@@ -0,0 +1,36 @@
+import os
+
+class ApiConfig:
+    """API configuration management"""
+
+    def __init__(self):
+        # Seconds a cached /stats or /services response may be served; 0 disables the cache
+        self.cache_ttl = float(os.getenv('API_CACHE_TTL', '5'))
+        self.cache_max_entries = int(os.getenv('API_CACHE_MAX_ENTRIES', '256'))
+
+        # Share cached responses between worker processes through files in shared memory
+        self.shared_cache = os.getenv('API_SHARED_CACHE', 'true').lower() in ('1', 'true', 'yes')
+        self.snapshot_dir = os.getenv('API_SNAPSHOT_DIR') or None
+
+        # Live streams: seconds between keep-alives, and batches a slow client may fall behind
+        self.stream_heartbeat = float(os.getenv('API_STREAM_HEARTBEAT', '15'))
+        self.stream_max_pending = int(os.getenv('API_STREAM_MAX_PENDING', '100'))
+        # Distinct stream filters followed at once, each one a thread and a change stream or poller
+        self.stream_max_feeds = int(os.getenv('API_STREAM_MAX_FEEDS', '100'))
+
+        # Response compression: bodies below the minimum size are sent as-is
+        self.compression = os.getenv('API_COMPRESSION', 'true').lower() in ('1', 'true', 'yes')
+        self.compression_min_size = int(os.getenv('API_COMPRESSION_MIN_SIZE', '1024'))
+        self.compression_levels = {
+            'gzip': int(os.getenv('API_GZIP_LEVEL', '6')),
+            'zstd': int(os.getenv('API_ZSTD_LEVEL', '3')),
+            'br': int(os.getenv('API_BROTLI_QUALITY', '4'))
+        }
+
+        # Production server (python main.py --workers N, or gunicorn -c api/gunicorn_conf.py)
+        self.workers = int(os.getenv('API_WORKERS', '1'))
+        self.max_requests = int(os.getenv('API_MAX_REQUESTS', '10000'))
+        self.max_requests_jitter = int(os.getenv('API_MAX_REQUESTS_JITTER', '1000'))
+        self.graceful_timeout = int(os.getenv('API_GRACEFUL_TIMEOUT', '30'))
+
+api_config = ApiConfig()
@@ -0,0 +1,85 @@
+"""
+Streaming export encoders
+
+Turn document streams from LogOperations.iter_logs / iter_events into
+NDJSON or CSV byte chunks, optionally gzip-compressed, without holding
+more than one cursor batch in memory.
+"""
+
+import csv
+import io
+import zlib
+from datetime import datetime
+from typing import List, Dict, Any, Iterable, Iterator
+
+from api.responses import dumps
+
+LOG_COLUMNS = [
+    'id', 'timestamp', 'service_name', 'service_type', 'host', 'log_level',
+    'status', 'message', 'sent_to_user', 'tags', 'metadata'
+]
+
+EVENT_COLUMNS = [
+    'id', 'timestamp', 'service_name', 'host', 'event_type', 'severity',
+    'description', 'duration', 'metadata'
+]
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+def _export_document(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Rename _id to id, as in the JSON endpoints"""
+    exported = {'id': str(document['_id'])} if '_id' in document else {}
+    exported.update((key, value) for key, value in document.items() if key != '_id')
+    return exported
+
+def ndjson_chunks(chunks: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """Encode batches of documents as newline-delimited JSON, one byte chunk per batch"""
+    for chunk in chunks:
+        lines = [dumps(_export_document(document)) for document in chunk]
+        if lines:
+            yield b'\n'.join(lines) + b'\n'
+
+def csv_chunks(chunks: Iterable[List[Dict[str, Any]]], columns: List[str]) -> Iterator[bytes]:
+    """Encode batches of documents as CSV rows under a header line"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> bytes:
+        data = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writerow(columns)
+    yield flush()
+
+    for chunk in chunks:
+        for document in chunk:
+            exported = _export_document(document)
+            row = []
+            for column in columns:
+                value = exported.get(column)
+                if isinstance(value, (dict, list)):
+                    value = dumps(value).decode()
+                elif isinstance(value, datetime):
+                    value = value.isoformat()
+                row.append('' if value is None else value)
+            writer.writerow(row)
+
+        data = flush()
+        if data:
+            yield data
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream into a single gzip member as it flows"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+
+    yield compressor.flush()
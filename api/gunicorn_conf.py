@@ -0,0 +1,49 @@
+"""
+Gunicorn settings for running the API in production
+
+    gunicorn -c api/gunicorn_conf.py api.main:app
+    # or: python api/main.py --workers 4
+
+The app is imported once in the master and forked into N uvicorn workers,
+so workers start warm and share the imported code pages. Workers are
+recycled after max_requests (with jitter, so they do not all restart at
+once) and get graceful_timeout seconds to finish in-flight requests and
+long polls. Cached responses are shared between workers through
+api/snapshots.py. Settings come from the same API_* variables as
+api/config.py.
+"""
+
+import multiprocessing
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from api.config import api_config
+
+chdir = project_root
+wsgi_app = "api.main:app"
+bind = f"{os.getenv('API_HOST', '0.0.0.0')}:{os.getenv('API_PORT', '8000')}"
+
+workers = api_config.workers if api_config.workers > 1 else multiprocessing.cpu_count()
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+
+max_requests = api_config.max_requests
+max_requests_jitter = api_config.max_requests_jitter
+graceful_timeout = api_config.graceful_timeout
+# Uvicorn workers heartbeat from the event loop, so long polls and exports do not trip this
+timeout = 60
+keepalive = 5
+
+def on_starting(server):
+    """Backfill service counters once, and start from empty shared snapshots"""
+    from api.main import backfill_service_stats, response_cache
+    backfill_service_stats()
+    response_cache.invalidate()
+
+def post_fork(server, worker):
+    """Every worker opens its own MongoDB connections; clients must not cross a fork"""
+    from database import mongo_connection
+    mongo_connection.disconnect()
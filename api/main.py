@@ -12,8 +12,10 @@ log delivery status. Provides endpoints to:
 """
 
 import os
+import re
 import sys
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional, Dict, Any
 import logging
 
@@ -26,26 +28,77 @@ if os.path.exists(venv_site_packages):
     sys.path.insert(0, venv_site_packages)
 sys.path.insert(0, project_root)
 
-from fastapi import FastAPI, HTTPException, Query, Path
+from fastapi import FastAPI, HTTPException, Query, Path, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 import uvicorn
 
-from database import log_operations, LogLevel
+from database import log_operations, LogLevel, ServiceStatus
+from database.async_operations import async_log_operations
+from database.pagination import next_cursor
+from database.uptime import uptime_reports
+from api.cache import ResponseCache
+from api.compression import CompressionMiddleware
+from api.config import api_config
+from api.export import LOG_COLUMNS, EVENT_COLUMNS, EXPORT_FORMATS, ndjson_chunks, csv_chunks, gzip_chunks
+from api.responses import FastJSONResponse, alias_ids
+from api.snapshots import SnapshotStore
+from api.streaming import FeedLimitReached, StreamHub, Subscription, to_message
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _snapshot_store() -> Optional[SnapshotStore]:
+    """Shared snapshots for the response cache, so worker processes do not each recompute"""
+    if not api_config.shared_cache or api_config.cache_ttl <= 0:
+        return None
+    try:
+        return SnapshotStore(api_config.snapshot_dir)
+    except OSError as e:
+        logger.warning(f"Shared response cache disabled: {e}")
+        return None
+
+# Cache for the dashboard endpoints, invalidated by new logs and API writes
+response_cache = ResponseCache(
+    ttl=api_config.cache_ttl,
+    max_entries=api_config.cache_max_entries,
+    shared=_snapshot_store()
+)
+
+# One database feed per live stream filter, shared by its SSE and WebSocket clients
+stream_hub = StreamHub(max_pending=api_config.stream_max_pending, max_feeds=api_config.stream_max_feeds)
+
 # FastAPI app
 app = FastAPI(
     title="Service Monitor API",
     description="REST API for service monitoring statistics and log management",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse
 )
 
+def backfill_service_stats() -> None:
+    """Rebuild service counters once for databases that predate them, before serving
+
+    Runs from the launching process (and gunicorn's master), never from a request.
+    """
+    try:
+        rebuilt = log_operations.backfill_service_stats()
+    except Exception as e:
+        logger.warning(f"Could not backfill service stats: {e}")
+        return
+    if rebuilt is not None:
+        logger.info(f"Backfilled service stats for {rebuilt} services")
+
+@app.on_event("shutdown")
+async def shutdown_database_pool():
+    """End live streams, let running database calls finish and stop the thread pool"""
+    stream_hub.shutdown()
+    async_log_operations.shutdown()
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -55,6 +108,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Negotiated zstd / brotli / gzip compression of response bodies
+if api_config.compression:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=api_config.compression_min_size,
+        levels=api_config.compression_levels
+    )
+
 # Pydantic models
 class LogEntry(BaseModel):
     id: str = Field(..., description="Log entry ID")
@@ -87,6 +148,47 @@ class ApiResponse(BaseModel):
 class MarkSentRequest(BaseModel):
     log_ids: List[str] = Field(..., description="List of log IDs to mark as sent")
 
+class ClaimRequest(BaseModel):
+    consumer: str = Field(..., description="Name of the consumer claiming the logs")
+    limit: int = Field(100, ge=1, le=1000, description="Maximum number of logs to claim")
+    visibility_timeout: int = Field(60, ge=1, le=3600, description="Seconds the logs stay leased to the consumer")
+    service_name: Optional[str] = Field(None, description="Filter by service name")
+    log_level: Optional[str] = Field(None, description="Filter by log level")
+
+class CursorRequest(BaseModel):
+    service_name: Optional[str] = Field(None, description="Only deliver logs of this service")
+    log_level: Optional[str] = Field(None, description="Only deliver logs of this level")
+    start_from_now: bool = Field(False, description="Skip logs written before the cursor was created")
+
+class CursorAckRequest(BaseModel):
+    log_id: str = Field(..., description="ID of the last log the consumer processed")
+
+# Longest /logs/unsent?wait= hold, below common proxy read timeouts
+MAX_UNSENT_WAIT = 60
+
+# Request helpers
+def _parse_level(log_level: Optional[str]) -> Optional[LogLevel]:
+    """Convert a log level query parameter to LogLevel, 400 if invalid"""
+    if not log_level:
+        return None
+    try:
+        return LogLevel(log_level.upper())
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid log level: {log_level}")
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated ?fields= parameter into a projection, 400 if invalid"""
+    if not fields:
+        return None
+
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    for name in names:
+        if name.startswith('$'):
+            raise HTTPException(status_code=400, detail=f"Invalid field: {name}")
+
+    # id is always returned
+    return [name for name in names if name != 'id'] or None
+
 # Health check endpoint
 @app.get("/", response_model=Dict[str, Any])
 async def root():
@@ -98,10 +200,24 @@ async def root():
         "endpoints": {
             "health": "/health",
             "statistics": "/stats",
+            "timeseries": "/stats/{service_name}/timeseries",
             "services": "/services",
+            "current_state": "/services/state",
+            "service_uptime": "/services/{service_name}/uptime",
+            "uptime_report": "/reports/uptime",
             "logs": "/logs",
             "unsent_logs": "/logs/unsent",
-            "mark_sent": "/logs/mark-sent"
+            "mark_sent": "/logs/mark-sent",
+            "claim": "/logs/claim",
+            "ack_lease": "/logs/leases/{lease_id}/ack",
+            "release_lease": "/logs/leases/{lease_id}/release",
+            "consumers": "/consumers",
+            "consumer_logs": "/consumers/{consumer}/logs",
+            "consumer_ack": "/consumers/{consumer}/ack",
+            "export_logs": "/export/logs",
+            "export_events": "/export/events",
+            "stream": "/stream/{kind}",
+            "websocket": "/ws/{kind}"
         }
     }
 
@@ -110,7 +226,7 @@ async def health_check():
     """Health check endpoint"""
     try:
         # Test database connection
-        connection_healthy = log_operations.connection.health_check()
+        connection_healthy = await async_log_operations.run(log_operations.connection.health_check)
 
         return {
             "status": "healthy" if connection_healthy else "unhealthy",
@@ -122,7 +238,9 @@ async def health_check():
                     "logs": log_operations.connection.config.logs_collection,
                     "events": log_operations.connection.config.events_collection
                 }
-            }
+            },
+            "cache": response_cache.stats(),
+            "streams": stream_hub.stats()
         }
     except Exception as e:
         logger.error(f"Health check failed: {e}")
@@ -132,24 +250,22 @@ async def health_check():
 @app.get("/stats", response_model=Dict[str, Any])
 async def get_general_statistics():
     """Get general monitoring statistics"""
-    try:
-        # Get service summary
-        summary = log_operations.get_service_summary()
-
-        # Get recent error logs count
-        error_logs = log_operations.get_error_logs(hours=24)
-
-        # Calculate additional stats
-        stats = {
-            "total_services": summary.get('total_services', 0),
-            "total_unsent_logs": sum(service.get('unsent_logs', 0) for service in summary.get('services', [])),
-            "total_logs_24h": sum(service.get('total_logs', 0) for service in summary.get('services', [])),
-            "error_logs_24h": len(error_logs),
-            "last_updated": summary.get('last_updated'),
-            "services": summary.get('services', [])
+    async def compute():
+        # Summary, 24h totals and exact 24h error counts in one aggregation
+        stats = await async_log_operations.get_general_statistics(hours=24)
+
+        return {
+            "total_services": stats.get('total_services', 0),
+            "total_unsent_logs": stats.get('total_unsent_logs', 0),
+            "total_logs": stats.get('total_logs', 0),
+            "total_logs_24h": stats.get('recent_logs', 0),
+            "error_logs_24h": stats.get('recent_errors', 0),
+            "last_updated": stats.get('last_updated'),
+            "services": stats.get('services', [])
         }
 
-        return stats
+    try:
+        return FastJSONResponse(await response_cache.get("stats", compute, async_log_operations.get_data_generation))
 
     except Exception as e:
         logger.error(f"Error getting statistics: {e}")
@@ -158,82 +274,277 @@ async def get_general_statistics():
 @app.get("/stats/{service_name}", response_model=Dict[str, Any])
 async def get_service_statistics(
     service_name: str = Path(..., description="Service name"),
-    hours: int = Query(24, ge=1, le=168, description="Hours to look back (1-168)")
+    hours: int = Query(24, ge=1, le=8784, description="Hours to look back (1-8784, long windows read rollups)"),
+    windows: Optional[str] = Query(None, description="Comma-separated windows in hours, e.g. 1,24,168 (replaces hours)")
 ):
-    """Get statistics for a specific service"""
-    try:
-        stats = log_operations.get_service_statistics(service_name, hours=hours)
+    """Get statistics for a specific service, optionally for several windows in one query"""
+    window_hours = None
+    if windows:
+        try:
+            window_hours = sorted({int(value) for value in windows.split(',') if value.strip()})
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid windows: {windows}")
+        if not window_hours or len(window_hours) > 10 or not all(1 <= h <= 8784 for h in window_hours):
+            raise HTTPException(status_code=400, detail="windows must list 1 to 10 values between 1 and 8784 hours")
+
+    async def compute():
+        stats = await async_log_operations.get_service_statistics(service_name, hours=hours, windows=window_hours)
 
         if not stats:
             raise HTTPException(status_code=404, detail=f"No data found for service: {service_name}")
 
         return stats
 
+    try:
+        return FastJSONResponse(await response_cache.get(
+            ("stats", service_name, hours, tuple(window_hours or ())), compute, async_log_operations.get_data_generation
+        ))
+
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error getting service statistics: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get service statistics: {str(e)}")
 
+BUCKET_UNITS = {'m': 60, 'h': 3600, 'd': 86400}
+MAX_TIMESERIES_BUCKETS = 5000
+
+@app.get("/stats/{service_name}/timeseries", response_model=Dict[str, Any])
+async def get_service_timeseries(
+    service_name: str = Path(..., description="Service name"),
+    hours: int = Query(24, ge=1, le=8784, description="Hours to look back"),
+    bucket: str = Query("5m", description="Bucket size: minutes (5m), hours (1h) or days (1d)")
+):
+    """Get log counts by level and status in fixed time buckets, as parallel arrays for charts"""
+    match = re.fullmatch(r'(\d+)([mhd])', bucket)
+    if not match or int(match.group(1)) < 1:
+        raise HTTPException(status_code=400, detail=f"Invalid bucket: {bucket}")
+
+    bucket_size = timedelta(seconds=int(match.group(1)) * BUCKET_UNITS[match.group(2)])
+    if timedelta(hours=hours) / bucket_size > MAX_TIMESERIES_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many buckets, use a larger bucket (at most {MAX_TIMESERIES_BUCKETS} per series)"
+        )
+
+    async def compute():
+        series = await async_log_operations.get_service_timeseries(service_name, hours=hours, bucket_size=bucket_size)
+
+        if not series:
+            raise HTTPException(status_code=500, detail="Failed to compute timeseries")
+
+        return {"bucket": bucket, **series}
+
+    try:
+        return FastJSONResponse(await response_cache.get(
+            ("timeseries", service_name, hours, bucket), compute, async_log_operations.get_data_generation
+        ))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting service timeseries: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get service timeseries: {str(e)}")
+
 # Services endpoints
 @app.get("/services", response_model=Dict[str, Any])
-async def get_services_summary():
-    """Get summary of all monitored services"""
+async def get_services_summary(
+    since: Optional[str] = Query(None, description="sync_token of a previous response: only services changed after it")
+):
+    """Get summary of all monitored services, or only those changed since a sync token"""
     try:
-        summary = log_operations.get_service_summary()
-        return summary
+        if since:
+            # Deltas are small and per client, so they skip the cache
+            try:
+                return FastJSONResponse(await async_log_operations.get_service_summary(since=since))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        return FastJSONResponse(await response_cache.get(
+            "services", async_log_operations.get_service_summary, async_log_operations.get_data_generation
+        ))
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting services summary: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get services summary: {str(e)}")
 
+@app.get("/services/state", response_model=Dict[str, Any])
+async def get_services_state(
+    service_name: Optional[str] = Query(None, description="Filter by service name"),
+    host: Optional[str] = Query(None, description="Filter by host"),
+    status: Optional[str] = Query(None, description="Filter by service status")
+):
+    """Get the live state of every monitored service"""
+    try:
+        # Convert status string to ServiceStatus enum if provided
+        status_filter = None
+        if status:
+            try:
+                status_filter = ServiceStatus(status.lower())
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+
+        states = await async_log_operations.get_current_state(
+            service_name=service_name,
+            host=host,
+            status=status_filter
+        )
+
+        by_status: Dict[str, int] = {}
+        for state in states:
+            by_status[state.get('status')] = by_status.get(state.get('status'), 0) + 1
+
+        return FastJSONResponse({
+            "total": len(states),
+            "by_status": by_status,
+            "services": states,
+            "last_updated": datetime.utcnow().isoformat()
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting services state: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get services state: {str(e)}")
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert a query datetime to the naive UTC stored in MongoDB; naive input is taken as UTC"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def _report_range(hours: int, start_time: Optional[datetime], end_time: Optional[datetime]):
+    """Resolve a report time range from explicit bounds or hours back from now"""
+    end_time = _naive_utc(end_time) or datetime.utcnow()
+    start_time = _naive_utc(start_time) or end_time - timedelta(hours=hours)
+    if start_time >= end_time:
+        raise HTTPException(status_code=400, detail="start_time must be before end_time")
+    return start_time, end_time
+
+@app.get("/services/{service_name}/uptime", response_model=Dict[str, Any])
+async def get_service_uptime(
+    service_name: str = Path(..., description="Service name"),
+    hours: int = Query(720, ge=1, le=8784, description="Hours to look back when start_time is not given"),
+    start_time: Optional[datetime] = Query(None, description="Start of the range (ISO 8601)"),
+    end_time: Optional[datetime] = Query(None, description="End of the range (ISO 8601), default now"),
+    max_gap_seconds: Optional[int] = Query(None, ge=1, description="How long a check describes the service")
+):
+    """Get availability, outages, MTTR and MTBF of a service, per host"""
+    range_start, range_end = _report_range(hours, start_time, end_time)
+    max_gap = timedelta(seconds=max_gap_seconds) if max_gap_seconds else None
+
+    async def compute():
+        report = await async_log_operations.run(
+            uptime_reports.get_uptime, range_start, range_end, service_name=service_name, max_gap=max_gap
+        )
+
+        if not report:
+            raise HTTPException(status_code=404, detail=f"No status checks found for service: {service_name}")
+
+        return {
+            "service_name": service_name,
+            "start_time": range_start.isoformat(),
+            "end_time": range_end.isoformat(),
+            "hosts": report
+        }
+
+    try:
+        # Keyed by the request, so relative ranges ("last 720 hours") are shared within the TTL
+        return FastJSONResponse(await response_cache.get(
+            ("uptime", service_name, hours, start_time, end_time, max_gap_seconds),
+            compute, async_log_operations.get_data_generation
+        ))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error computing service uptime: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to compute uptime: {str(e)}")
+
+@app.get("/reports/uptime", response_model=Dict[str, Any])
+async def get_uptime_report(
+    hours: int = Query(720, ge=1, le=8784, description="Hours to look back when start_time is not given"),
+    start_time: Optional[datetime] = Query(None, description="Start of the range (ISO 8601)"),
+    end_time: Optional[datetime] = Query(None, description="End of the range (ISO 8601), default now"),
+    max_gap_seconds: Optional[int] = Query(None, ge=1, description="How long a check describes the service")
+):
+    """Get the uptime figures of every monitored service, worst availability first"""
+    range_start, range_end = _report_range(hours, start_time, end_time)
+    max_gap = timedelta(seconds=max_gap_seconds) if max_gap_seconds else None
+
+    async def compute():
+        report = await async_log_operations.run(uptime_reports.get_uptime, range_start, range_end, max_gap=max_gap)
+
+        uptime = sum(item['uptime_seconds'] for item in report)
+        downtime = sum(item['downtime_seconds'] for item in report)
+
+        return {
+            "start_time": range_start.isoformat(),
+            "end_time": range_end.isoformat(),
+            "total_services": len(report),
+            "availability": round(100 * uptime / (uptime + downtime), 4) if uptime + downtime else None,
+            "outages": sum(item['outages'] for item in report),
+            "services": report
+        }
+
+    try:
+        return FastJSONResponse(await response_cache.get(
+            ("uptime_report", hours, start_time, end_time, max_gap_seconds),
+            compute, async_log_operations.get_data_generation
+        ))
+
+    except Exception as e:
+        logger.error(f"Error computing uptime report: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to compute uptime report: {str(e)}")
+
 # Logs endpoints
 @app.get("/logs", response_model=Dict[str, Any])
 async def get_logs(
     service_name: Optional[str] = Query(None, description="Filter by service name"),
     log_level: Optional[str] = Query(None, description="Filter by log level"),
     hours: int = Query(24, ge=1, le=168, description="Hours to look back"),
-    limit: int = Query(100, ge=1, le=1000, description="Maximum number of logs to return")
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of logs to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. timestamp,log_level,status")
 ):
-    """Get logs with optional filters"""
+    """Get logs with optional filters, paged newest first by next_cursor"""
     try:
-        # Convert log_level string to LogLevel enum if provided
-        level_filter = None
-        if log_level:
-            try:
-                level_filter = LogLevel(log_level.upper())
-            except ValueError:
-                raise HTTPException(status_code=400, detail=f"Invalid log level: {log_level}")
+        projection = _parse_fields(fields)
+
+        level_filter = _parse_level(log_level)
 
         # Get logs
-        if service_name:
-            logs = log_operations.get_recent_logs(service_name, hours=hours, limit=limit)
-        else:
-            end_time = datetime.utcnow()
-            start_time = end_time - timedelta(hours=hours)
-            logs = log_operations.get_logs(
+        end_time = datetime.utcnow()
+        start_time = end_time - timedelta(hours=hours)
+        try:
+            logs = await async_log_operations.get_logs(
+                service_name=service_name,
                 log_level=level_filter,
                 start_time=start_time,
                 end_time=end_time,
-                limit=limit
+                limit=limit,
+                cursor=cursor,
+                fields=projection
             )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-        # Convert ObjectId to string for JSON serialization
-        for log in logs:
-            if '_id' in log:
-                log['id'] = str(log['_id'])
-                del log['_id']
+        page_cursor = next_cursor(logs, limit)
 
-        return {
+        return FastJSONResponse({
             "total": len(logs),
-            "logs": logs,
+            "logs": alias_ids(logs),
+            "next_cursor": page_cursor,
             "filters": {
                 "service_name": service_name,
                 "log_level": log_level,
                 "hours": hours,
-                "limit": limit
+                "limit": limit,
+                "fields": projection
             }
-        }
+        })
 
     except HTTPException:
         raise
@@ -245,40 +556,70 @@ async def get_logs(
 async def get_unsent_logs(
     service_name: Optional[str] = Query(None, description="Filter by service name"),
     log_level: Optional[str] = Query(None, description="Filter by log level"),
-    limit: int = Query(100, ge=1, le=1000, description="Maximum number of logs to return")
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of logs to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. timestamp,log_level,status"),
+    wait: int = Query(0, ge=0, le=MAX_UNSENT_WAIT, description="Seconds to hold the request until matching logs arrive")
 ):
-    """Get logs that haven't been sent to users yet"""
+    """Get logs that haven't been sent to users yet, paged newest first by next_cursor
+
+    With wait, an empty first page is held until a matching log is written
+    or the wait expires (long polling). Waiters are woken by the shared
+    live feed, not by polling the database per request.
+    """
     try:
-        # Convert log_level string to LogLevel enum if provided
-        level_filter = None
-        if log_level:
+        projection = _parse_fields(fields)
+
+        level_filter = _parse_level(log_level)
+
+        async def fetch():
             try:
-                level_filter = LogLevel(log_level.upper())
-            except ValueError:
-                raise HTTPException(status_code=400, detail=f"Invalid log level: {log_level}")
+                return await async_log_operations.get_unsent_logs(
+                    service_name=service_name,
+                    log_level=level_filter,
+                    limit=limit,
+                    cursor=cursor,
+                    fields=projection
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
 
-        # Get unsent logs
-        logs = log_operations.get_unsent_logs(
-            service_name=service_name,
-            log_level=level_filter,
-            limit=limit
-        )
+        # Only the first page waits; later pages are already known to exist
+        if wait and not cursor:
+            subscription = _subscribe('logs', {
+                'sent_to_user': False,
+                'service_name': service_name,
+                'log_level': level_filter and level_filter.value
+            })
+            try:
+                # One deadline for both steps, so the hold never exceeds wait
+                deadline = time.monotonic() + wait
+                # Query only once the feed follows the collection, so a log
+                # written between the query and the wait still wakes us
+                await subscription.live(wait)
+                logs = await fetch()
+                remaining = deadline - time.monotonic()
+                if not logs and remaining > 0 and await subscription.wait(remaining):
+                    logs = await fetch()
+            finally:
+                stream_hub.unsubscribe(subscription)
+        else:
+            logs = await fetch()
 
-        # Convert ObjectId to string for JSON serialization
-        for log in logs:
-            if '_id' in log:
-                log['id'] = str(log['_id'])
-                del log['_id']
+        page_cursor = next_cursor(logs, limit)
 
-        return {
+        return FastJSONResponse({
             "total": len(logs),
-            "logs": logs,
+            "logs": alias_ids(logs),
+            "next_cursor": page_cursor,
             "filters": {
                 "service_name": service_name,
                 "log_level": log_level,
-                "limit": limit
+                "limit": limit,
+                "fields": projection,
+                "wait": wait
             }
-        }
+        })
 
     except HTTPException:
         raise
@@ -294,7 +635,8 @@ async def mark_logs_as_sent(request: MarkSentRequest):
             raise HTTPException(status_code=400, detail="No log IDs provided")
 
         # Mark logs as sent
-        updated_count = log_operations.mark_logs_as_sent(request.log_ids)
+        updated_count = await async_log_operations.mark_logs_as_sent(request.log_ids)
+        response_cache.invalidate()
 
         return ApiResponse(
             success=True,
@@ -312,6 +654,358 @@ async def mark_logs_as_sent(request: MarkSentRequest):
         logger.error(f"Error marking logs as sent: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to mark logs as sent: {str(e)}")
 
+@app.post("/logs/claim", response_model=Dict[str, Any])
+async def claim_unsent_logs(request: ClaimRequest):
+    """Lease a batch of unsent logs to a consumer, acknowledged later by lease ID"""
+    try:
+        level_filter = _parse_level(request.log_level)
+
+        lease = await async_log_operations.claim_unsent_logs(
+            consumer=request.consumer,
+            limit=request.limit,
+            visibility_timeout=request.visibility_timeout,
+            service_name=request.service_name,
+            log_level=level_filter
+        )
+
+        if not lease:
+            raise HTTPException(status_code=500, detail="Failed to claim logs")
+
+        logs = alias_ids(lease['logs'])
+
+        return FastJSONResponse({
+            "lease_id": lease['lease_id'],
+            "consumer": lease['consumer'],
+            "expires_at": lease['expires_at'],
+            "total": len(logs),
+            "logs": logs
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error claiming logs: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to claim logs: {str(e)}")
+
+@app.post("/logs/leases/{lease_id}/ack", response_model=ApiResponse)
+async def ack_lease(lease_id: str = Path(..., description="Lease ID returned by /logs/claim")):
+    """Mark every log of a lease as sent to users"""
+    try:
+        acked_count = await async_log_operations.ack_lease(lease_id)
+        response_cache.invalidate()
+
+        return ApiResponse(
+            success=True,
+            message=f"Marked {acked_count} logs as sent",
+            data={"lease_id": lease_id, "updated": acked_count}
+        )
+
+    except Exception as e:
+        logger.error(f"Error acknowledging lease: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to acknowledge lease: {str(e)}")
+
+@app.post("/logs/leases/{lease_id}/release", response_model=ApiResponse)
+async def release_lease(lease_id: str = Path(..., description="Lease ID returned by /logs/claim")):
+    """Return the logs of a lease to the queue without marking them as sent"""
+    try:
+        released_count = await async_log_operations.release_lease(lease_id)
+
+        return ApiResponse(
+            success=True,
+            message=f"Released {released_count} logs",
+            data={"lease_id": lease_id, "released": released_count}
+        )
+
+    except Exception as e:
+        logger.error(f"Error releasing lease: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to release lease: {str(e)}")
+
+def _cursor_response(cursor: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a delivery cursor document for JSON serialization"""
+    return {
+        "consumer": cursor['_id'],
+        "timestamp": cursor.get('timestamp'),
+        "last_id": str(cursor['last_id']) if cursor.get('last_id') is not None else None,
+        "filters": cursor.get('filters', {}),
+        "updated_at": cursor.get('updated_at')
+    }
+
+# Delivery cursor endpoints
+@app.get("/consumers", response_model=Dict[str, Any])
+async def list_consumers():
+    """List the delivery cursor of every consumer"""
+    try:
+        cursors = [_cursor_response(cursor) for cursor in await async_log_operations.list_cursors()]
+        return FastJSONResponse({"total": len(cursors), "consumers": cursors})
+
+    except Exception as e:
+        logger.error(f"Error listing consumers: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to list consumers: {str(e)}")
+
+@app.put("/consumers/{consumer}", response_model=ApiResponse)
+async def register_consumer(
+    request: CursorRequest,
+    consumer: str = Path(..., description="Consumer name")
+):
+    """Create or reset a consumer's delivery cursor"""
+    try:
+        level_filter = _parse_level(request.log_level)
+
+        cursor = await async_log_operations.register_cursor(
+            consumer,
+            service_name=request.service_name,
+            log_level=level_filter,
+            start_from_now=request.start_from_now
+        )
+
+        if not cursor:
+            raise HTTPException(status_code=500, detail="Failed to register consumer")
+
+        return ApiResponse(
+            success=True,
+            message=f"Registered consumer {consumer}",
+            data=_cursor_response(cursor)
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error registering consumer: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to register consumer: {str(e)}")
+
+@app.get("/consumers/{consumer}/logs", response_model=Dict[str, Any])
+async def get_consumer_logs(
+    consumer: str = Path(..., description="Consumer name"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of logs to return")
+):
+    """Get the logs after a consumer's cursor, oldest first; the cursor moves only on ack"""
+    try:
+        logs = await async_log_operations.get_logs_after_cursor(consumer, limit=limit)
+
+        if logs is None:
+            raise HTTPException(status_code=404, detail=f"Consumer not registered: {consumer}")
+
+        return FastJSONResponse({
+            "consumer": consumer,
+            "total": len(logs),
+            "logs": alias_ids(logs)
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving consumer logs: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve consumer logs: {str(e)}")
+
+@app.post("/consumers/{consumer}/ack", response_model=ApiResponse)
+async def ack_consumer(
+    request: CursorAckRequest,
+    consumer: str = Path(..., description="Consumer name")
+):
+    """Advance a consumer's cursor past the last processed log"""
+    try:
+        advanced = await async_log_operations.ack_cursor(consumer, request.log_id)
+
+        return ApiResponse(
+            success=True,
+            message="Cursor advanced" if advanced else "Cursor already at or past this log",
+            data={"consumer": consumer, "advanced": advanced}
+        )
+
+    except Exception as e:
+        logger.error(f"Error acknowledging consumer cursor: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to acknowledge cursor: {str(e)}")
+
+# Export endpoints
+def _export_response(chunks, columns: List[str], name: str, export_format: str, gzip: bool) -> StreamingResponse:
+    """Stream document batches as an NDJSON or CSV download"""
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format: {export_format}")
+
+    body = ndjson_chunks(chunks) if export_format == 'ndjson' else csv_chunks(chunks, columns)
+    filename = f"{name}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.{export_format}"
+    media_type = EXPORT_FORMATS[export_format]
+
+    if gzip:
+        body = gzip_chunks(body)
+        filename += '.gz'
+        media_type = 'application/gzip'
+
+    # Sync generators are iterated in the threadpool, so cursor reads do not block the event loop
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+@app.get("/export/logs")
+async def export_logs(
+    service_name: Optional[str] = Query(None, description="Filter by service name"),
+    log_level: Optional[str] = Query(None, description="Filter by log level"),
+    host: Optional[str] = Query(None, description="Filter by host"),
+    start_time: Optional[datetime] = Query(None, description="Start of the range (ISO 8601), default 24 hours before end_time"),
+    end_time: Optional[datetime] = Query(None, description="End of the range (ISO 8601), default now"),
+    format: str = Query("ndjson", description="ndjson or csv"),
+    gzip: bool = Query(False, description="Gzip the download"),
+    batch_size: int = Query(1000, ge=1, le=10000, description="Documents fetched per cursor round trip")
+):
+    """Stream every log of a time range straight from the database cursor, oldest first"""
+    level_filter = _parse_level(log_level)
+    end_time = _naive_utc(end_time) or datetime.utcnow()
+    start_time = _naive_utc(start_time) or end_time - timedelta(hours=24)
+
+    chunks = log_operations.iter_logs(
+        service_name=service_name,
+        log_level=level_filter,
+        start_time=start_time,
+        end_time=end_time,
+        host=host,
+        batch_size=batch_size,
+        chunked=True
+    )
+    return _export_response(chunks, LOG_COLUMNS, "logs", format, gzip)
+
+@app.get("/export/events")
+async def export_events(
+    service_name: Optional[str] = Query(None, description="Filter by service name"),
+    event_type: Optional[str] = Query(None, description="Filter by event type"),
+    severity: Optional[str] = Query(None, description="Filter by severity"),
+    host: Optional[str] = Query(None, description="Filter by host"),
+    start_time: Optional[datetime] = Query(None, description="Start of the range (ISO 8601), default 24 hours before end_time"),
+    end_time: Optional[datetime] = Query(None, description="End of the range (ISO 8601), default now"),
+    format: str = Query("ndjson", description="ndjson or csv"),
+    gzip: bool = Query(False, description="Gzip the download"),
+    batch_size: int = Query(1000, ge=1, le=10000, description="Documents fetched per cursor round trip")
+):
+    """Stream every event of a time range straight from the database cursor, oldest first"""
+    severity_filter = _parse_level(severity)
+    end_time = _naive_utc(end_time) or datetime.utcnow()
+    start_time = _naive_utc(start_time) or end_time - timedelta(hours=24)
+
+    chunks = log_operations.iter_events(
+        service_name=service_name,
+        event_type=event_type,
+        severity=severity_filter,
+        start_time=start_time,
+        end_time=end_time,
+        host=host,
+        batch_size=batch_size,
+        chunked=True
+    )
+    return _export_response(chunks, EVENT_COLUMNS, "events", format, gzip)
+
+# Live streaming endpoints
+# Query parameters each stream accepts, and the document field they filter
+STREAM_PARAMETERS = {
+    'logs': {'service_name': 'service_name', 'host': 'host', 'log_level': 'log_level', 'status': 'status'},
+    'events': {'service_name': 'service_name', 'host': 'host', 'log_level': 'severity', 'event_type': 'event_type'},
+    'state': {'service_name': 'service_name', 'host': 'host', 'status': 'status'}
+}
+
+def _stream_filter(kind: str, **parameters: Optional[str]) -> Dict[str, Any]:
+    """Build the equality filter of a live stream, 400 if a parameter does not apply to its kind"""
+    if kind not in STREAM_PARAMETERS:
+        raise HTTPException(status_code=404, detail=f"Unknown stream: {kind}")
+
+    given = {name: value for name, value in parameters.items() if value}
+    unsupported = sorted(set(given) - set(STREAM_PARAMETERS[kind]))
+    if unsupported:
+        raise HTTPException(status_code=400, detail=f"Not supported by {kind} streams: {', '.join(unsupported)}")
+
+    if 'log_level' in given:
+        given['log_level'] = _parse_level(given['log_level']).value
+    if 'status' in given:
+        try:
+            given['status'] = ServiceStatus(given['status'].lower()).value
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {given['status']}")
+
+    return {STREAM_PARAMETERS[kind][name]: value for name, value in given.items()}
+
+def _subscribe(kind: str, query_filter: Dict[str, Any]) -> Subscription:
+    """Subscribe to the live feed of a filter, 503 when no more feeds can be started"""
+    try:
+        return stream_hub.subscribe(kind, query_filter)
+    except FeedLimitReached as e:
+        logger.warning(f"Refusing {kind} stream {query_filter}: {e}")
+        raise HTTPException(status_code=503, detail="Too many live streams, retry later", headers={"Retry-After": "5"})
+
+@app.get("/stream/{kind}")
+async def stream_sse(
+    kind: str = Path(..., description="logs, events or state"),
+    service_name: Optional[str] = Query(None, description="Filter by service name"),
+    host: Optional[str] = Query(None, description="Filter by host"),
+    log_level: Optional[str] = Query(None, description="Filter by log level (severity for events)"),
+    event_type: Optional[str] = Query(None, description="Filter events by type"),
+    status: Optional[str] = Query(None, description="Filter logs or state by service status")
+):
+    """Push new documents matching the filter as Server-Sent Events"""
+    query_filter = _stream_filter(
+        kind, service_name=service_name, host=host, log_level=log_level, event_type=event_type, status=status
+    )
+    subscription = _subscribe(kind, query_filter)
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            async for documents in subscription.batches(heartbeat=api_config.stream_heartbeat):
+                if not documents:
+                    yield ": keep-alive\n\n"
+                    continue
+                for document in documents:
+                    yield f"event: {kind}\ndata: {to_message(document)}\n\n"
+            if subscription.overflowed:
+                yield "event: overflow\ndata: {}\n\n"
+        finally:
+            stream_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.websocket("/ws/{kind}")
+async def stream_websocket(
+    websocket: WebSocket,
+    kind: str,
+    service_name: Optional[str] = None,
+    host: Optional[str] = None,
+    log_level: Optional[str] = None,
+    event_type: Optional[str] = None,
+    status: Optional[str] = None
+):
+    """Push new documents matching the filter over a WebSocket, one JSON text message each"""
+    try:
+        query_filter = _stream_filter(
+            kind, service_name=service_name, host=host, log_level=log_level, event_type=event_type, status=status
+        )
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=str(e.detail))
+        return
+
+    await websocket.accept()
+    try:
+        subscription = _subscribe(kind, query_filter)
+    except HTTPException as e:
+        # 1013: try again later
+        await websocket.close(code=1013, reason=str(e.detail))
+        return
+
+    try:
+        async for documents in subscription.batches(heartbeat=api_config.stream_heartbeat):
+            if not documents:
+                await websocket.send_text('{"type": "keep-alive"}')
+                continue
+            for document in documents:
+                await websocket.send_text(to_message(document))
+        # The hub ended the stream: the client fell behind or the server is stopping
+        await websocket.close(code=1013 if subscription.overflowed else 1001)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        stream_hub.unsubscribe(subscription)
+
 # Main entry point
 if __name__ == "__main__":
     import argparse
@@ -320,16 +1014,46 @@ if __name__ == "__main__":
     parser.add_argument("--host", default="0.0.0.0", help="Host to bind to")
     parser.add_argument("--port", type=int, default=8000, help="Port to bind to")
     parser.add_argument("--reload", action="store_true", help="Enable auto-reload for development")
+    parser.add_argument("--workers", type=int, default=api_config.workers, help="Worker processes (production mode when > 1)")
 
     args = parser.parse_args()
 
     print(f"🚀 Starting Service Monitor API on {args.host}:{args.port}")
     print(f"📚 API Documentation: http://{args.host}:{args.port}/docs")
 
-    uvicorn.run(
-        "main:app",
-        host=args.host,
-        port=args.port,
-        reload=args.reload,
-        log_level="info"
-    )
\ No newline at end of file
+    backfill_service_stats()
+
+    if args.workers > 1 and not args.reload:
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            gunicorn = None
+
+        if gunicorn is not None:
+            # Preloaded app, worker recycling and graceful restarts, see gunicorn_conf.py
+            print(f"⚙️  Production mode: {args.workers} gunicorn workers")
+            conf = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gunicorn_conf.py")
+            os.execvp("gunicorn", [
+                "gunicorn", "-c", conf, "--bind", f"{args.host}:{args.port}",
+                "--workers", str(args.workers), "api.main:app"
+            ])
+
+        # Without gunicorn: several uvicorn processes, recycled too, but without preload
+        print(f"⚙️  Production mode: {args.workers} uvicorn workers (install gunicorn to preload the app)")
+        uvicorn.run(
+            "main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            limit_max_requests=api_config.max_requests,
+            timeout_graceful_shutdown=api_config.graceful_timeout,
+            log_level="info"
+        )
+    else:
+        uvicorn.run(
+            "main:app",
+            host=args.host,
+            port=args.port,
+            reload=args.reload,
+            log_level="info"
+        )
\ No newline at end of file
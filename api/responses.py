@@ -0,0 +1,55 @@
+"""
+Fast JSON responses for document-heavy endpoints
+
+FastAPI's default path validates the returned dict against response_model,
+walks it with jsonable_encoder and then encodes it with the json module,
+all in Python. Endpoints returning hundreds of log documents instead return
+FastJSONResponse, which encodes the documents once with orjson (datetimes
+natively, ObjectIds through a default hook) and skips the validation and
+walk.
+
+orjson is optional: without it the same responses are encoded with json.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # Slower, but the API works without it
+    orjson = None
+
+def json_default(value: Any) -> Any:
+    """Serialize the BSON types found in log documents"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """Encode content as compact JSON, ObjectIds as strings and datetimes as ISO 8601"""
+    if orjson is not None:
+        return orjson.dumps(content, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=json_default, separators=(',', ':')).encode('utf-8')
+
+def alias_ids(documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Expose _id as id, as a string, in place
+
+    Converting here is cheaper than leaving every id to the encoder's
+    default callback; other ObjectIds and datetimes are left to dumps().
+    """
+    for document in documents:
+        if '_id' in document:
+            document['id'] = str(document.pop('_id'))
+    return documents
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson when available"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,139 @@
+"""
+Cache snapshots shared by every API worker process
+
+With several workers each process has its own ResponseCache, so without
+sharing every worker would recompute /stats, /services and the reports on
+its own. A SnapshotStore keeps computed responses as files in shared memory
+(/dev/shm, a RAM-backed tmpfs, when available): whichever worker computes a
+response first publishes it, the others load it instead of querying MongoDB.
+
+Each snapshot is one file written atomically (write + rename): a JSON header
+line with its expiry and data generation, then the JSON-encoded response.
+Responses are stored as they are sent, so a worker loading a snapshot serves
+the same body the computing worker did. A per-key lock file lets one worker
+compute while the others wait for its snapshot, and an epoch file touched on
+every clear() lets each worker notice invalidations made by the others.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Hashable, Optional
+
+from api.responses import dumps
+
+try:
+    import fcntl
+except ImportError:  # Windows has no flock: snapshots are still shared, just not coalesced
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+def default_directory() -> str:
+    """Shared memory when the system has it, the temp directory otherwise"""
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(base, f"service-monitor-api-{os.getuid() if hasattr(os, 'getuid') else 'user'}")
+
+class SnapshotLock:
+    """An exclusive, non-blocking per-key lock held by one worker process"""
+
+    def __init__(self, fd: Optional[int]):
+        self._fd = fd
+
+    def release(self) -> None:
+        if self._fd is not None:
+            # Closing the descriptor releases the flock
+            os.close(self._fd)
+            self._fd = None
+
+class SnapshotStore:
+    """Expiring, generation-tagged responses shared between processes through files"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or default_directory()
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+
+        # Anyone able to write here could plant responses for the API to serve
+        if hasattr(os, 'getuid') and os.stat(self.directory).st_uid != os.getuid():
+            raise PermissionError(f"Snapshot directory {self.directory} is owned by another user")
+
+    def _path(self, key: Hashable) -> str:
+        name = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name)
+
+    def get(self, key: Hashable, generation: Any) -> Optional[Any]:
+        """Load a snapshot that has not expired and matches generation, else None"""
+        try:
+            with open(self._path(key) + '.snap', 'rb') as f:
+                header, _, payload = f.read().partition(b'\n')
+            expires_at, stored_generation = json.loads(header)
+        except (OSError, ValueError):
+            return None
+
+        if expires_at <= time.time() or stored_generation != generation:
+            return None
+
+        return orjson.loads(payload) if orjson is not None else json.loads(payload)
+
+    def put(self, key: Hashable, value: Any, generation: Any, ttl: float) -> None:
+        """Publish a snapshot for every worker, replacing any previous one atomically"""
+        path = self._path(key) + '.snap'
+        temporary = f"{path}.{os.getpid()}.tmp"
+
+        try:
+            header = json.dumps([time.time() + ttl, generation]).encode('utf-8')
+            with open(temporary, 'wb') as f:
+                f.write(header + b'\n' + dumps(value))
+            os.replace(temporary, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not write cache snapshot: {e}")
+            try:
+                os.unlink(temporary)
+            except OSError:
+                pass
+
+    def try_lock(self, key: Hashable) -> Optional[SnapshotLock]:
+        """Take the key's compute lock, or None if another worker holds it"""
+        if fcntl is None:
+            return SnapshotLock(None)
+
+        fd = os.open(self._path(key) + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return None
+        return SnapshotLock(fd)
+
+    def epoch(self) -> int:
+        """Time of the last clear() by any worker, part of every cache generation"""
+        try:
+            return os.stat(os.path.join(self.directory, 'epoch')).st_mtime_ns
+        except OSError:
+            return 0
+
+    def clear(self) -> None:
+        """Drop every snapshot, e.g. after a write through the API"""
+        try:
+            with open(os.path.join(self.directory, 'epoch'), 'a'):
+                pass
+            os.utime(os.path.join(self.directory, 'epoch'))
+            names = os.listdir(self.directory)
+        except OSError as e:
+            logger.warning(f"Could not clear cache snapshots: {e}")
+            return
+
+        for name in names:
+            if name.endswith('.snap'):
+                try:
+                    os.unlink(os.path.join(self.directory, name))
+                except OSError:
+                    pass
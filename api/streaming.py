@@ -0,0 +1,215 @@
+"""
+Live push of new logs, events and service state to API clients
+
+Every distinct (kind, filter) gets one ChangeFeed read by one background
+thread, however many SSE or WebSocket clients follow it. New documents are
+fanned out to the subscribers' queues on the event loop; the feed stops
+a few seconds after its last subscriber leaves, so clients that reconnect
+in a loop (long polling) keep reusing it.
+
+A subscriber that falls too far behind is disconnected instead of letting
+its queue grow without bound; clients reconnect and, for logs, catch up
+through /logs or a delivery cursor. Each feed costs a thread and a change
+stream or poller, so their number is capped (FeedLimitReached).
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from pymongo.errors import PyMongoError
+
+from api.responses import alias_ids, dumps
+from database.changes import ChangeFeed, FEED_SOURCES
+
+logger = logging.getLogger(__name__)
+
+FeedKey = Tuple[str, Tuple[Tuple[str, Any], ...]]
+
+class FeedLimitReached(Exception):
+    """Raised by StreamHub.subscribe when a new feed would exceed max_feeds"""
+
+def to_message(document: Dict[str, Any]) -> str:
+    """Render a feed document as JSON, with _id exposed as id like the REST endpoints"""
+    return dumps(alias_ids([dict(document)])[0]).decode('utf-8')
+
+class Subscription:
+    """One client's queue of document batches; None marks the end of the stream"""
+
+    def __init__(self, key: FeedKey, max_pending: int, ready: asyncio.Event):
+        self.key = key
+        self.max_pending = max_pending
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.overflowed = False
+        self._ready = ready
+
+    def push(self, documents: List[Dict[str, Any]]) -> bool:
+        """Queue a batch, or end the stream if the client is too far behind"""
+        if self.queue.qsize() >= self.max_pending:
+            self.overflowed = True
+            self.close()
+            return False
+        self.queue.put_nowait(documents)
+        return True
+
+    def close(self) -> None:
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def live(self, timeout: float) -> bool:
+        """Wait up to timeout seconds until the feed follows the collection
+
+        Feeds open on their own thread after subscribe(); only documents
+        written after this returns True are guaranteed to be pushed.
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait up to timeout seconds for the next batch; False on timeout or end of stream"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout) is not None
+        except asyncio.TimeoutError:
+            return False
+
+    async def batches(self, heartbeat: Optional[float] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield batches as they arrive; an empty batch every heartbeat seconds of silence"""
+        while True:
+            try:
+                documents = await asyncio.wait_for(self.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield []
+                continue
+            if documents is None:
+                return
+            yield documents
+
+class _Feed:
+    """A ChangeFeed, the thread reading it and its subscribers"""
+
+    def __init__(self, key: FeedKey):
+        self.key = key
+        self.feed = ChangeFeed(key[0], dict(key[1]))
+        self.subscribers: Set[Subscription] = set()
+        self.stopping = threading.Event()
+        # Set on the event loop once the feed is open (or failed to open)
+        self.ready = asyncio.Event()
+        self.thread: Optional[threading.Thread] = None
+
+class StreamHub:
+    """Shares one database feed between all subscribers of the same filter"""
+
+    def __init__(self, max_pending: int = 100, max_feeds: int = 100, read_timeout: float = 1.0, linger: float = 5.0):
+        self.max_pending = max_pending
+        self.max_feeds = max_feeds
+        self.read_timeout = read_timeout
+        self.linger = linger
+        self._feeds: Dict[FeedKey, _Feed] = {}
+
+    @staticmethod
+    def feed_key(kind: str, query_filter: Dict[str, Any]) -> FeedKey:
+        if kind not in FEED_SOURCES:
+            raise ValueError(f"Unknown feed kind: {kind}")
+        return kind, tuple(sorted((field, value) for field, value in query_filter.items() if value is not None))
+
+    def subscribe(self, kind: str, query_filter: Dict[str, Any]) -> Subscription:
+        """Follow new documents of a kind matching an equality filter
+
+        Filters already followed share their feed; a new filter raises
+        FeedLimitReached when max_feeds feeds (lingering ones included) run.
+        """
+        key = self.feed_key(kind, query_filter)
+
+        feed = self._feeds.get(key)
+        if feed is None:
+            if len(self._feeds) >= self.max_feeds:
+                raise FeedLimitReached(f"{len(self._feeds)} live feeds running")
+            feed = _Feed(key)
+            self._feeds[key] = feed
+            self._start(feed)
+
+        subscription = Subscription(key, self.max_pending, feed.ready)
+        feed.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        feed = self._feeds.get(subscription.key)
+        if feed is not None and subscription in feed.subscribers:
+            feed.subscribers.discard(subscription)
+            if not feed.subscribers:
+                asyncio.get_running_loop().call_later(self.linger, self._stop_if_idle, feed)
+
+    def _stop_if_idle(self, feed: _Feed) -> None:
+        if not feed.subscribers:
+            self._stop(feed)
+
+    def _start(self, feed: _Feed) -> None:
+        loop = asyncio.get_running_loop()
+
+        def run():
+            logger.info(f"Starting {feed.key[0]} feed {dict(feed.key[1])}")
+            try:
+                try:
+                    feed.feed.open()
+                except PyMongoError as e:
+                    # Reads retry opening; subscribers just lose the guarantee of live()
+                    logger.warning(f"Could not open {feed.key[0]} feed: {e}")
+                loop.call_soon_threadsafe(feed.ready.set)
+
+                while not feed.stopping.is_set():
+                    documents = feed.feed.read(timeout=self.read_timeout)
+                    if documents and not feed.stopping.is_set():
+                        loop.call_soon_threadsafe(self._publish, feed, documents)
+            except Exception as e:
+                logger.error(f"{feed.key[0]} feed failed: {e}")
+                loop.call_soon_threadsafe(self._fail, feed)
+            finally:
+                feed.feed.close()
+
+        feed.thread = threading.Thread(target=run, name=f"feed-{feed.key[0]}", daemon=True)
+        feed.thread.start()
+
+    def _publish(self, feed: _Feed, documents: List[Dict[str, Any]]) -> None:
+        if feed.stopping.is_set():
+            return
+        for subscription in list(feed.subscribers):
+            if not subscription.push(documents):
+                logger.warning(f"Dropping slow subscriber of {feed.key[0]} feed")
+                feed.subscribers.discard(subscription)
+        if not feed.subscribers:
+            self._stop(feed)
+
+    def _fail(self, feed: _Feed) -> None:
+        feed.ready.set()
+        for subscription in feed.subscribers:
+            subscription.close()
+        feed.subscribers.clear()
+        self._stop(feed)
+
+    def _stop(self, feed: _Feed) -> None:
+        # A new feed may already have replaced this one under the same key
+        if self._feeds.get(feed.key) is feed:
+            del self._feeds[feed.key]
+        # The thread notices within one read_timeout and closes the feed
+        feed.stopping.set()
+
+    def shutdown(self) -> None:
+        """End every stream and stop the feed threads"""
+        for feed in list(self._feeds.values()):
+            for subscription in feed.subscribers:
+                subscription.close()
+            feed.subscribers.clear()
+            self._stop(feed)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "feeds": len(self._feeds),
+            "max_feeds": self.max_feeds,
+            "subscribers": sum(len(feed.subscribers) for feed in self._feeds.values()),
+            "modes": sorted({feed.feed.mode for feed in self._feeds.values()})
+        }
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+API Serialization Benchmark
+
+Compare how long the API takes to turn a page of log documents into a
+response body: the previous path (ids rewritten with str() in a loop, dict
+validated against response_model and encoded by FastAPI) against
+FastJSONResponse. Both run through a real FastAPI request, without MongoDB.
+
+Usage:
+    python benchmark_serialization.py --rows 1000 --repeat 200
+"""
+
+import argparse
+import asyncio
+import copy
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+# Setup Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+venv_path = os.path.join(project_root, "venv")
+venv_site_packages = os.path.join(venv_path, "lib", f"python{sys.version_info.major}.{sys.version_info.minor}", "site-packages")
+
+if os.path.exists(venv_site_packages):
+    sys.path.insert(0, venv_site_packages)
+sys.path.insert(0, project_root)
+
+from bson import ObjectId
+from fastapi import FastAPI
+
+from api.responses import FastJSONResponse, alias_ids, orjson
+
+def make_logs(rows: int) -> List[Dict[str, Any]]:
+    """Log documents shaped like the ones find() returns"""
+    now = datetime.utcnow()
+    return [{
+        '_id': ObjectId(),
+        'service_name': f"service-{i % 20}.service",
+        'service_type': 'local',
+        'host': f"host-{i % 5}",
+        'service_key': f"host-{i % 5}:service-{i % 20}.service",
+        'log_level': 'ERROR' if i % 10 == 0 else 'INFO',
+        'message': f"Service check completed: active (iteration {i})",
+        'timestamp': now - timedelta(seconds=i),
+        'status': 'active',
+        'metadata': {'check_duration_ms': i % 300, 'pid': 1000 + i},
+        'tags': ['monitoring', 'systemd'],
+        'sent_to_user': False
+    } for i in range(rows)]
+
+def build_app(pages: Dict[str, List[List[Dict[str, Any]]]]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/legacy", response_model=Dict[str, Any])
+    async def legacy():
+        logs = pages['legacy'].pop()
+        for log in logs:
+            if '_id' in log:
+                log['id'] = str(log['_id'])
+                del log['_id']
+        return {"total": len(logs), "logs": logs, "next_cursor": None}
+
+    @app.get("/fast", response_model=Dict[str, Any])
+    async def fast():
+        logs = pages['fast'].pop()
+        return FastJSONResponse({"total": len(logs), "logs": alias_ids(logs), "next_cursor": None})
+
+    return app
+
+async def request(app: FastAPI, path: str) -> bytes:
+    """Run one GET through the ASGI app and return the body"""
+    chunks = []
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'root_path': '',
+        'query_string': b'', 'headers': [], 'server': ('benchmark', 80), 'client': ('benchmark', 1)
+    }
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+
+    await app(scope, receive, send)
+    return b''.join(chunks)
+
+async def measure(app: FastAPI, path: str, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await request(app, path)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+async def main(rows: int, repeat: int):
+    logs = make_logs(rows)
+    # Endpoints rewrite documents in place, so every request gets its own copy
+    pages = {name: [copy.deepcopy(logs) for _ in range(repeat + 1)] for name in ('legacy', 'fast')}
+    app = build_app(pages)
+
+    legacy_body = await request(app, "/legacy")
+    fast_body = await request(app, "/fast")
+
+    print(f"Encoder: {'orjson ' + orjson.__version__ if orjson else 'json (orjson not installed)'}")
+    print(f"Response: {rows} logs, {len(legacy_body) / 1024:.0f} KB (legacy) / {len(fast_body) / 1024:.0f} KB (fast)")
+
+    legacy = await measure(app, "/legacy", repeat)
+    fast = await measure(app, "/fast", repeat)
+
+    print(f"\n{'path':<8} {'median ms':>10} {'p95 ms':>10}")
+    for name, timings in (('legacy', legacy), ('fast', fast)):
+        p95 = sorted(timings)[int(len(timings) * 0.95) - 1]
+        print(f"{name:<8} {statistics.median(timings):>10.2f} {p95:>10.2f}")
+
+    saved = statistics.median(legacy) - statistics.median(fast)
+    print(f"\nSaved {saved:.2f} ms per response ({statistics.median(legacy) / statistics.median(fast):.1f}x faster)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API serialization benchmark")
+    parser.add_argument("--rows", type=int, default=1000, help="Logs per response")
+    parser.add_argument("--repeat", type=int, default=200, help="Requests per path")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows, args.repeat))
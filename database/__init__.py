@@ -8,6 +8,11 @@ Key Components:
 - models: Data models for logs and events
 - connection: MongoDB connection management
 - operations: Database operations (save, query, statistics)
+- async_operations: Awaitable wrapper running operations in a thread pool
+- rollups: Hourly and daily downsampling of old logs
+- pagination: Keyset page tokens over (timestamp, _id)
+- uptime: Availability, outages, MTTR and MTBF from status checks
+- changes: Change feeds of new logs, events and service state
 - config: Configuration management
 
 Usage:
@@ -31,6 +36,7 @@ Usage:
 from .models import LogEntry, EventEntry, LogLevel, ServiceStatus, ServiceStatus
 from .connection import mongo_connection
 from .operations import log_operations
+from .rollups import log_rollups
 from .config import MongoConfig
 
 __all__ = [
@@ -40,6 +46,7 @@ __all__ = [
     'ServiceStatus',
     'mongo_connection',
     'log_operations',
+    'log_rollups',
     'MongoConfig'
 ]
 
@@ -0,0 +1,75 @@
+"""
+Non-blocking access to LogOperations for asyncio applications
+
+pymongo is synchronous, so calling LogOperations from an async endpoint
+blocks the event loop for the whole round trip. AsyncLogOperations runs
+every call in a dedicated thread pool sized below the MongoDB connection
+pool, so concurrent requests overlap their database waits while the sync
+LogOperations (used by the monitor) stays unchanged.
+
+Usage:
+    from database.async_operations import async_log_operations
+
+    logs = await async_log_operations.get_logs(service_name="nginx", limit=50)
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from .operations import LogOperations, log_operations
+
+logger = logging.getLogger(__name__)
+
+class AsyncLogOperations:
+    """Awaitable facade over LogOperations backed by a bounded thread pool
+
+    Every LogOperations method is exposed under the same name and signature
+    as a coroutine function. Generator methods (iter_logs, iter_events) are
+    returned as-is: iterate them from a thread, e.g. through StreamingResponse.
+    """
+
+    def __init__(self, operations: Optional[LogOperations] = None, max_workers: Optional[int] = None):
+        self.operations = operations or log_operations
+        self.max_workers = max_workers or self.operations.connection.config.async_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def connection(self):
+        return self.operations.connection
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Created lazily so every worker process gets its own threads
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mongo")
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking callable in the database thread pool and await its result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.operations, name)
+        if not callable(attribute) or inspect.isgeneratorfunction(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        async def call(*args, **kwargs):
+            return await self.run(attribute, *args, **kwargs)
+
+        return call
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the thread pool, waiting for running calls by default"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+            logger.info("Database thread pool stopped")
+
+# Global async operations instance
+async_log_operations = AsyncLogOperations()
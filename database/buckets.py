@@ -0,0 +1,136 @@
+"""
+Bucket pattern storage for high-frequency status checks
+
+All steady-state checks of one service_key within one hour share a single
+document holding compact parallel arrays:
+
+    {
+        "service_key": "localhost:nginx.service",
+        "bucket_start": ISODate("2025-09-26T07:00:00Z"),
+        "service_name": "nginx.service", "service_type": "local",
+        "host": "localhost", "tags": [...], "metadata": {...},
+        "count": 240,
+        "offsets": [12, 15012, ...],   # milliseconds since bucket_start
+        "codes": [0, 0, ...],          # index into STATUS_CODES
+        "messages": {"0": "[local-nginx] status=active active=True"}
+    }
+
+The message is kept once per status code, the constant fields once per
+bucket. Expanded entries look like regular log documents.
+"""
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from .models import LogLevel, ServiceStatus
+
+BUCKET_SIZE = timedelta(hours=1)
+
+STATUS_CODES = [status.value for status in ServiceStatus]
+
+def bucket_start_for(timestamp: datetime) -> datetime:
+    """Get the start of the hourly bucket holding a timestamp"""
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+def bucket_update(document: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Build the (filter, update) pair appending a status check log document to its bucket"""
+    bucket_start = bucket_start_for(document['timestamp'])
+    offset = int((document['timestamp'] - bucket_start).total_seconds() * 1000)
+    code = STATUS_CODES.index(document['status'])
+
+    bucket_filter = {'service_key': document['service_key'], 'bucket_start': bucket_start}
+    update = {
+        '$setOnInsert': {
+            'service_name': document['service_name'],
+            'service_type': document['service_type'],
+            'host': document['host'],
+            'tags': document['tags']
+        },
+        '$set': {
+            'metadata': document['metadata'],
+            f'messages.{code}': document['message'],
+            'updated_at': datetime.utcnow()
+        },
+        '$push': {'offsets': offset, 'codes': code},
+        '$inc': {'count': 1},
+        '$min': {'first_timestamp': document['timestamp']},
+        '$max': {'last_timestamp': document['timestamp']}
+    }
+    return bucket_filter, update
+
+def expand_bucket(
+    bucket: Dict[str, Any],
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    descending: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """Yield the checks of a bucket as regular log documents, in time order"""
+    bucket_start = bucket['bucket_start']
+    offsets = bucket.get('offsets', [])
+    codes = bucket.get('codes', [])
+    messages = bucket.get('messages', {})
+
+    # Offsets are appended in write order, which is not guaranteed to be time order;
+    # the index breaks ties the same way as the zero-padded _id below
+    order = sorted(range(len(offsets)), key=lambda index: (offsets[index], index), reverse=descending)
+
+    for index in order:
+        timestamp = bucket_start + timedelta(milliseconds=offsets[index])
+        if (start_time and timestamp < start_time) or (end_time and timestamp > end_time):
+            continue
+
+        code = codes[index]
+        yield {
+            '_id': f"{bucket['_id']}:{index:06d}",
+            'service_name': bucket['service_name'],
+            'service_type': bucket['service_type'],
+            'host': bucket['host'],
+            'log_level': LogLevel.INFO.value,
+            'message': messages.get(str(code), ''),
+            'timestamp': timestamp,
+            'status': STATUS_CODES[code],
+            'metadata': bucket.get('metadata', {}),
+            'tags': bucket.get('tags', []),
+            'sent_to_user': True,
+            'date': timestamp.strftime('%Y-%m-%d'),
+            'hour': timestamp.hour,
+            'service_key': bucket['service_key']
+        }
+
+def bucket_entries_stages(
+    start_time: datetime,
+    end_time: datetime,
+    service_name: Optional[str] = None,
+    timestamp_match: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """Aggregation stages expanding buckets of [start_time, end_time) into log-shaped documents
+
+    Meant for $unionWith, so aggregations over raw logs also count bucketed
+    checks. Only the fields used by aggregations are projected.
+    timestamp_match narrows the expanded entries further (e.g. several ranges).
+    """
+    bucket_match: Dict[str, Any] = {
+        'bucket_start': {'$gte': bucket_start_for(start_time), '$lt': end_time}
+    }
+    if service_name:
+        bucket_match['service_name'] = service_name
+
+    return [
+        {'$match': bucket_match},
+        {'$unwind': {'path': '$offsets', 'includeArrayIndex': 'position'}},
+        {
+            '$project': {
+                '_id': 0,
+                'service_name': 1,
+                'service_type': 1,
+                'service_key': 1,
+                'host': 1,
+                'timestamp': {'$add': ['$bucket_start', '$offsets']},
+                'log_level': {'$literal': LogLevel.INFO.value},
+                'status': {'$arrayElemAt': [
+                    {'$literal': STATUS_CODES},
+                    {'$arrayElemAt': ['$codes', '$position']}
+                ]},
+                'sent_to_user': {'$literal': True}
+            }
+        },
+        {'$match': timestamp_match or {'timestamp': {'$gte': start_time, '$lt': end_time}}}
+    ]
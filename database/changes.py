@@ -0,0 +1,181 @@
+"""
+Change feeds: new logs, new events and live service state as they are written
+
+A ChangeFeed follows one collection with one filter. It reads a MongoDB
+change stream when the server supports them (replica sets and sharded
+clusters) and otherwise tails the collection by polling an ever-increasing
+marker (_id for logs and events, updated_at for the live state), so a
+standalone development server works too.
+
+Reads block, so feeds are meant to be driven from a thread, one feed per
+filter however many clients follow it (see api/streaming.py).
+
+Usage:
+    from database.changes import ChangeFeed
+
+    feed = ChangeFeed('logs', {'service_name': 'nginx'})
+    while True:
+        for log in feed.read(timeout=1.0):
+            print(log['message'])
+"""
+
+import logging
+import time
+from typing import List, Dict, Any, Optional
+
+from pymongo.collection import Collection
+from pymongo.errors import OperationFailure, PyMongoError
+
+from .connection import mongo_connection
+
+logger = logging.getLogger(__name__)
+
+# Feed kind -> (collection property, polling marker, change stream operations)
+FEED_SOURCES = {
+    'logs': ('logs_collection', '_id', ['insert']),
+    'events': ('events_collection', '_id', ['insert']),
+    'state': ('current_state_collection', 'updated_at', ['insert', 'update', 'replace'])
+}
+
+class ChangeFeed:
+    """Blocking reader of the documents written after it was opened"""
+
+    def __init__(self, kind: str, query_filter: Optional[Dict[str, Any]] = None, batch_size: int = 500):
+        if kind not in FEED_SOURCES:
+            raise ValueError(f"Unknown feed kind: {kind}")
+
+        self.kind = kind
+        self.query_filter = dict(query_filter or {})
+        self.batch_size = batch_size
+        self.connection = mongo_connection
+
+        self._stream = None
+        self._resume_token = None
+        self._polling = not self.connection.config.change_streams
+        self._position: Any = None
+        self._opened = False
+
+    @property
+    def mode(self) -> str:
+        return 'polling' if self._polling else 'change_stream'
+
+    def _collection(self) -> Optional[Collection]:
+        property_name = FEED_SOURCES[self.kind][0]
+        return getattr(self.connection, property_name)
+
+    def _open(self, collection: Collection) -> None:
+        """Start following the collection from now"""
+        if not self._polling:
+            try:
+                self._stream = self._open_stream(collection)
+                return
+            except OperationFailure as e:
+                # Standalone servers have no oplog to watch
+                logger.info(f"Change streams unavailable ({e}), polling {collection.name} instead")
+                self._polling = True
+
+        marker = FEED_SOURCES[self.kind][1]
+        newest = collection.find_one({}, {marker: 1}, sort=[(marker, -1)])
+        self._position = newest[marker] if newest else None
+
+    def _open_stream(self, collection: Collection):
+        operations = FEED_SOURCES[self.kind][2]
+        match = {'operationType': {'$in': operations}}
+        match.update({f'fullDocument.{field}': value for field, value in self.query_filter.items()})
+
+        return collection.watch(
+            [{'$match': match}],
+            full_document='updateLookup' if self.kind == 'state' else None,
+            resume_after=self._resume_token,
+            batch_size=self.batch_size,
+            max_await_time_ms=1000
+        )
+
+    def open(self) -> None:
+        """Start following the collection now rather than at the first read
+
+        Documents written after open() returns are read, even if read() is
+        first called later. Raises PyMongoError if the database is unreachable.
+        """
+        collection = self._collection()
+        if collection is not None and not self._opened:
+            self._open(collection)
+            self._opened = True
+
+    def read(self, timeout: float = 1.0) -> List[Dict[str, Any]]:
+        """Wait up to timeout seconds for new documents, oldest first
+
+        Returns an empty list when nothing arrived. Transient errors are
+        logged and retried on the next read, resuming where the feed stopped.
+        """
+        try:
+            collection = self._collection()
+            if collection is None:
+                time.sleep(timeout)
+                return []
+
+            if not self._opened:
+                self._open(collection)
+                self._opened = True
+
+            if self._polling:
+                return self._poll(collection, timeout)
+            return self._read_stream(collection, timeout)
+
+        except PyMongoError as e:
+            logger.warning(f"MongoDB error reading {self.kind} feed: {e}")
+            self._close_stream()
+            time.sleep(timeout)
+            return []
+
+    def _read_stream(self, collection: Collection, timeout: float) -> List[Dict[str, Any]]:
+        if self._stream is None:
+            self._stream = self._open_stream(collection)
+
+        documents = []
+        deadline = time.monotonic() + timeout
+
+        # try_next waits at most maxAwaitTimeMS on the server, then returns None
+        while len(documents) < self.batch_size and time.monotonic() < deadline:
+            change = self._stream.try_next()
+            self._resume_token = self._stream.resume_token
+            if change is None:
+                if documents:
+                    break
+                continue
+            if change.get('fullDocument') is not None:
+                documents.append(change['fullDocument'])
+
+        return documents
+
+    def _poll(self, collection: Collection, timeout: float) -> List[Dict[str, Any]]:
+        marker = FEED_SOURCES[self.kind][1]
+        poll_interval = self.connection.config.change_poll_interval
+        deadline = time.monotonic() + timeout
+
+        while True:
+            query_filter = dict(self.query_filter)
+            if self._position is not None:
+                query_filter[marker] = {'$gt': self._position}
+
+            documents = list(collection.find(query_filter).sort(marker, 1).limit(self.batch_size))
+            if documents:
+                self._position = documents[-1][marker]
+                return documents
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            time.sleep(min(poll_interval, remaining))
+
+    def _close_stream(self) -> None:
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            except PyMongoError:
+                pass
+            self._stream = None
+
+    def close(self) -> None:
+        """Release the server-side change stream, if any"""
+        self._close_stream()
@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Optional, Dict
 
 class MongoConfig:
     """MongoDB configuration management"""
@@ -9,6 +9,33 @@ class MongoConfig:
         self.database_name = os.getenv('MONGO_DB_NAME', 'service_monitoring')
         self.logs_collection = os.getenv('MONGO_LOGS_COLLECTION', 'logs')
         self.events_collection = os.getenv('MONGO_EVENTS_COLLECTION', 'events')
+        self.hourly_rollups_collection = os.getenv('MONGO_HOURLY_ROLLUPS_COLLECTION', 'logs_hourly')
+        self.daily_rollups_collection = os.getenv('MONGO_DAILY_ROLLUPS_COLLECTION', 'logs_daily')
+        self.rollup_state_collection = os.getenv('MONGO_ROLLUP_STATE_COLLECTION', 'rollup_state')
+        self.service_stats_collection = os.getenv('MONGO_SERVICE_STATS_COLLECTION', 'service_stats')
+        self.current_state_collection = os.getenv('MONGO_CURRENT_STATE_COLLECTION', 'current_state')
+        self.status_buckets_collection = os.getenv('MONGO_STATUS_BUCKETS_COLLECTION', 'status_buckets')
+        self.delivery_cursors_collection = os.getenv('MONGO_DELIVERY_CURSORS_COLLECTION', 'delivery_cursors')
+
+        # Store steady-state status checks in hourly bucket documents instead of one log each
+        self.bucket_status_checks = os.getenv('MONGO_BUCKET_STATUS_CHECKS', 'false').lower() in ('1', 'true', 'yes')
+
+        # Raw logs younger than this are never rolled up, so late writes still land in rollups
+        self.rollup_after_hours = int(os.getenv('MONGO_ROLLUP_AFTER_HOURS', '2'))
+
+        # Uptime reports: a status check describes the service for at most this long
+        self.uptime_max_gap_seconds = int(os.getenv('MONGO_UPTIME_MAX_GAP_SECONDS', '300'))
+
+        # Threads running LogOperations calls for async callers (the API), kept below maxPoolSize
+        self.async_workers = int(os.getenv('MONGO_ASYNC_WORKERS', '32'))
+
+        # Live feeds read change streams (replica sets); off, or on a standalone server, they poll
+        self.change_streams = os.getenv('MONGO_CHANGE_STREAMS', 'true').lower() in ('1', 'true', 'yes')
+        self.change_poll_interval = float(os.getenv('MONGO_CHANGE_POLL_INTERVAL', '1.0'))
+
+        # Retention in days per log level / event severity, enforced by TTL indexes
+        self.logs_retention_days = self._get_retention('MONGO_LOGS_RETENTION_DAYS')
+        self.events_retention_days = self._get_retention('MONGO_EVENTS_RETENTION_DAYS')
 
     def _get_connection_string(self) -> str:
         """Build MongoDB connection string from environment variables"""
@@ -23,6 +50,35 @@ class MongoConfig:
         else:
             return f"mongodb://{host}:{port}"
 
+    @staticmethod
+    def _get_retention(env_var: str) -> Dict[str, int]:
+        """Parse a retention spec like "INFO=7,ERROR=90,*=30" into {level: days}
+
+        The "*" key applies to every level that is not listed explicitly.
+        An empty or missing value disables retention (logs are kept forever).
+        """
+        retention = {}
+        raw = os.getenv(env_var, '')
+
+        for item in raw.split(','):
+            item = item.strip()
+            if not item:
+                continue
+
+            level, _, days = item.partition('=')
+            try:
+                days_value = int(days)
+            except ValueError:
+                raise ValueError(f"Invalid retention '{item}' in {env_var}, expected LEVEL=DAYS")
+
+            if days_value < 1:
+                raise ValueError(f"Retention for '{level}' in {env_var} must be >= 1 day")
+
+            level = level.strip()
+            retention[level if level == '*' else level.upper()] = days_value
+
+        return retention
+
     @property
     def connection_options(self) -> dict:
         """MongoDB connection options"""
@@ -32,4 +88,4 @@ class MongoConfig:
             'maxPoolSize': 50,
             'retryWrites': True,
             'w': 'majority'
-        }
\ No newline at end of file
+        }
@@ -1,10 +1,12 @@
 import logging
+import threading
 from typing import Optional
 from pymongo import MongoClient
 from pymongo.database import Database
 from pymongo.collection import Collection
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 from .config import MongoConfig
+from .indexes import IndexManager
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +16,8 @@ class MongoConnection:
     _instance: Optional['MongoConnection'] = None
     _client: Optional[MongoClient] = None
     _database: Optional[Database] = None
+    # Lazy connects can race when calls arrive from a thread pool
+    _lock = threading.RLock()
 
     def __new__(cls) -> 'MongoConnection':
         if cls._instance is None:
@@ -27,6 +31,11 @@ class MongoConnection:
 
     def connect(self) -> bool:
         """Establish connection to MongoDB"""
+        with self._lock:
+            return self._connect()
+
+    def _connect(self) -> bool:
+        """Connect, with the lock held"""
         try:
             if self._client is None:
                 logger.info(f"Connecting to MongoDB at {self.config.connection_string}")
@@ -61,34 +70,31 @@ class MongoConnection:
             logger.info("Disconnected from MongoDB")
 
     def _create_indexes(self):
-        """Create database indexes for optimal performance"""
+        """Create database indexes for optimal performance
+
+        Indexes are declared in database/indexes.py. On connect only missing
+        indexes are created and configured TTL expiries are updated; dropping
+        indexes outside the spec, stale retention included, is left to
+        'python -m database.maintenance indexes'.
+        """
         if self._database is None:
             return
 
         try:
-            # Logs collection indexes
-            logs_collection = self._database[self.config.logs_collection]
-            logs_collection.create_index("timestamp")
-            logs_collection.create_index("service_name")
-            logs_collection.create_index("service_key")
-            logs_collection.create_index("log_level")
-            logs_collection.create_index([("service_name", 1), ("timestamp", -1)])
-            logs_collection.create_index([("date", 1), ("service_name", 1)])
-            logs_collection.create_index("host")
-
-            # Events collection indexes
-            events_collection = self._database[self.config.events_collection]
-            events_collection.create_index("timestamp")
-            events_collection.create_index("service_name")
-            events_collection.create_index("service_key")
-            events_collection.create_index("event_type")
-            events_collection.create_index([("service_name", 1), ("timestamp", -1)])
-
-            logger.info("Database indexes created successfully")
+            results = self.index_manager.reconcile(drop_unmanaged=False)
+            logger.info(f"Database indexes reconciled: {results}")
 
         except Exception as e:
             logger.warning(f"Failed to create indexes: {e}")
 
+    @property
+    def index_manager(self) -> Optional[IndexManager]:
+        """Get an index manager bound to the current database"""
+        db = self.database
+        if db is not None:
+            return IndexManager(db, self.config)
+        return None
+
     @property
     def database(self) -> Optional[Database]:
         """Get database instance"""
@@ -112,6 +118,62 @@ class MongoConnection:
             return db[self.config.events_collection]
         return None
 
+    @property
+    def hourly_rollups_collection(self) -> Optional[Collection]:
+        """Get hourly rollups collection"""
+        db = self.database
+        if db is not None:
+            return db[self.config.hourly_rollups_collection]
+        return None
+
+    @property
+    def daily_rollups_collection(self) -> Optional[Collection]:
+        """Get daily rollups collection"""
+        db = self.database
+        if db is not None:
+            return db[self.config.daily_rollups_collection]
+        return None
+
+    @property
+    def rollup_state_collection(self) -> Optional[Collection]:
+        """Get rollup watermarks collection"""
+        db = self.database
+        if db is not None:
+            return db[self.config.rollup_state_collection]
+        return None
+
+    @property
+    def service_stats_collection(self) -> Optional[Collection]:
+        """Get per-service counters collection"""
+        db = self.database
+        if db is not None:
+            return db[self.config.service_stats_collection]
+        return None
+
+    @property
+    def current_state_collection(self) -> Optional[Collection]:
+        """Get current state collection"""
+        db = self.database
+        if db is not None:
+            return db[self.config.current_state_collection]
+        return None
+
+    @property
+    def status_buckets_collection(self) -> Optional[Collection]:
+        """Get status check buckets collection"""
+        db = self.database
+        if db is not None:
+            return db[self.config.status_buckets_collection]
+        return None
+
+    @property
+    def delivery_cursors_collection(self) -> Optional[Collection]:
+        """Get per-consumer delivery cursors collection"""
+        db = self.database
+        if db is not None:
+            return db[self.config.delivery_cursors_collection]
+        return None
+
     def health_check(self) -> bool:
         """Check if MongoDB connection is healthy"""
         try:
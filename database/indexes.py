@@ -0,0 +1,279 @@
+import logging
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple
+from pymongo.collection import Collection
+from pymongo.database import Database
+from .config import MongoConfig
+from .models import LogLevel
+
+logger = logging.getLogger(__name__)
+
+# Partial index holding only undelivered logs, see LogOperations.get_unsent_logs
+UNSENT_INDEX = 'unsent_queue'
+
+@dataclass
+class IndexSpec:
+    """Declarative description of one index"""
+    keys: List[Tuple[str, int]]
+    name: Optional[str] = None
+    options: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.name is None:
+            # Same naming scheme as the server, so existing indexes match by name
+            self.name = "_".join(f"{key}_{direction}" for key, direction in self.keys)
+
+    @property
+    def is_ttl(self) -> bool:
+        return 'expireAfterSeconds' in self.options
+
+    def matches(self, index: Dict[str, Any]) -> bool:
+        """Whether an existing index (from list_indexes) has this key pattern and options"""
+        if list(index['key'].items()) != self.keys:
+            return False
+
+        for option in ('unique', 'partialFilterExpression'):
+            if index.get(option) != self.options.get(option):
+                return False
+
+        return True
+
+@dataclass
+class QueryShape:
+    """A query issued by LogOperations, used to check index coverage"""
+    name: str
+    collection: str
+    filter: Dict[str, Any]
+    sort: List[Tuple[str, int]] = field(default_factory=list)
+    hint: Optional[str] = None
+
+def retention_index_specs(retention_days: Dict[str, int], level_field: str) -> List[IndexSpec]:
+    """Expand a {level: days} retention map into per-level partial TTL indexes"""
+    specs = []
+    default_days = retention_days.get('*')
+
+    for level in LogLevel:
+        days = retention_days.get(level.value, default_days)
+        if days is None:
+            continue
+
+        specs.append(IndexSpec(
+            [("timestamp", 1)],
+            name=f"ttl_{level.value.lower()}",
+            options={
+                'partialFilterExpression': {level_field: level.value},
+                'expireAfterSeconds': days * 86400
+            }
+        ))
+
+    return specs
+
+def index_specs(config: MongoConfig) -> Dict[str, List[IndexSpec]]:
+    """Declared indexes per collection, derived from the LogOperations query shapes
+
+    Single-field indexes that are a prefix of a compound index are left out
+    on purpose: the compound index serves those queries as well.
+    """
+    specs = {
+        config.logs_collection: [
+            # _id breaks timestamp ties, so (timestamp, _id) positions are a total order
+            # for delivery cursors and keyset pages
+            IndexSpec([("timestamp", 1), ("_id", 1)]),
+            IndexSpec([("service_name", 1), ("timestamp", -1), ("_id", -1)]),
+            IndexSpec([("log_level", 1), ("timestamp", -1), ("_id", -1)]),
+            IndexSpec([("host", 1), ("timestamp", -1), ("_id", -1)]),
+            IndexSpec(
+                [("service_name", 1), ("log_level", 1), ("timestamp", -1), ("_id", -1)],
+                name=UNSENT_INDEX,
+                options={'partialFilterExpression': {'sent_to_user': False}}
+            ),
+            # Only leased logs are indexed, see LogOperations.claim_unsent_logs
+            IndexSpec([("lease_id", 1)], options={'partialFilterExpression': {'lease_id': {'$exists': True}}})
+        ],
+        config.events_collection: [
+            IndexSpec([("timestamp", 1)]),
+            IndexSpec([("service_name", 1), ("timestamp", -1)]),
+            IndexSpec([("event_type", 1), ("timestamp", -1)])
+        ],
+        config.service_stats_collection: [
+            IndexSpec([("latest_timestamp", -1)]),
+            IndexSpec([("updated_at", 1)])
+        ],
+        config.current_state_collection: [
+            IndexSpec([("status", 1), ("service_name", 1)]),
+            IndexSpec([("service_name", 1)])
+        ],
+        config.status_buckets_collection: [
+            IndexSpec([("service_key", 1), ("bucket_start", 1)], options={'unique': True}),
+            IndexSpec([("service_name", 1), ("bucket_start", -1)]),
+            IndexSpec([("bucket_start", -1)])
+        ]
+    }
+
+    # Rollup collections ($merge needs a unique index on its "on" fields)
+    for rollup_collection in (config.hourly_rollups_collection, config.daily_rollups_collection):
+        specs[rollup_collection] = [
+            IndexSpec([("service_name", 1), ("bucket", 1)], options={'unique': True}),
+            IndexSpec([("bucket", 1)])
+        ]
+
+    # Retention, enforced by the server's TTL monitor
+    specs[config.logs_collection] += retention_index_specs(config.logs_retention_days, 'log_level')
+    specs[config.events_collection] += retention_index_specs(config.events_retention_days, 'severity')
+
+    # Bucketed checks are all INFO logs; a bucket expires once its newest check does
+    bucket_days = config.logs_retention_days.get(LogLevel.INFO.value, config.logs_retention_days.get('*'))
+    if bucket_days is not None:
+        specs[config.status_buckets_collection].append(IndexSpec(
+            [("last_timestamp", 1)],
+            name=f"ttl_{LogLevel.INFO.value.lower()}",
+            options={'expireAfterSeconds': bucket_days * 86400}
+        ))
+
+    return specs
+
+def _plan_stages(plan: Any) -> List[str]:
+    """Collect every stage name of an explain plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            stages.append(plan['stage'])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+def _plan_indexes(plan: Any) -> List[str]:
+    """Collect the index names used by an explain plan tree"""
+    names = []
+    if isinstance(plan, dict):
+        if 'indexName' in plan:
+            names.append(plan['indexName'])
+        for value in plan.values():
+            names.extend(_plan_indexes(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            names.extend(_plan_indexes(item))
+    return names
+
+class IndexManager:
+    """Create, reconcile and verify indexes from the declarative spec"""
+
+    def __init__(self, database: Database, config: MongoConfig):
+        self.database = database
+        self.config = config
+        self.specs = index_specs(config)
+
+    def _reconcile_collection(
+        self,
+        collection: Collection,
+        specs: List[IndexSpec],
+        drop_unmanaged: bool,
+        dry_run: bool
+    ) -> Dict[str, List[str]]:
+        """Bring one collection's indexes in line with its spec"""
+        changes: Dict[str, List[str]] = {'created': [], 'updated': [], 'dropped': []}
+        existing = {index['name']: index for index in collection.list_indexes() if index['name'] != '_id_'}
+        wanted = {spec.name: spec for spec in specs}
+        # Only a process with retention configured for this collection may remove retention
+        manages_retention = any(spec.is_ttl for spec in specs)
+
+        for name, index in existing.items():
+            spec = wanted.get(name)
+
+            if spec is None:
+                if name.startswith('ttl_') and not manages_retention:
+                    if drop_unmanaged:
+                        logger.info(f"Keeping {collection.name}.{name}: no retention configured in this process")
+                    continue
+                if drop_unmanaged:
+                    changes['dropped'].append(name)
+                    if not dry_run:
+                        collection.drop_index(name)
+            elif not spec.matches(index):
+                changes['dropped'].append(name)
+                if not dry_run:
+                    collection.drop_index(name)
+            elif spec.is_ttl and index.get('expireAfterSeconds') != spec.options['expireAfterSeconds']:
+                # collMod changes the expiry in place, without rebuilding the index
+                changes['updated'].append(name)
+                if not dry_run:
+                    self.database.command({
+                        'collMod': collection.name,
+                        'index': {'name': name, 'expireAfterSeconds': spec.options['expireAfterSeconds']}
+                    })
+
+        for name, spec in wanted.items():
+            if name in existing and name not in changes['dropped']:
+                continue
+
+            changes['created'].append(name)
+            if not dry_run:
+                collection.create_index(spec.keys, name=name, **spec.options)
+
+        return changes
+
+    def create_declared(self, collection: Collection, like: str) -> None:
+        """Create the indexes declared for one collection on another, e.g. a staging copy"""
+        for spec in self.specs.get(like, []):
+            collection.create_index(spec.keys, name=spec.name, **spec.options)
+
+    def reconcile(self, drop_unmanaged: bool = True, dry_run: bool = False) -> Dict[str, Dict[str, List[str]]]:
+        """Create missing indexes and drop redundant ones
+
+        With drop_unmanaged, every index not declared in the spec is dropped
+        (e.g. single-field indexes shadowed by a compound one). Without it,
+        which is what runs on connect, nothing outside the spec is dropped.
+
+        TTL indexes of levels no longer retained are dropped only with
+        drop_unmanaged and only when this process has retention configured
+        for the collection, so processes started without the retention
+        settings (the API, its workers) never remove retention.
+        """
+        results = {}
+
+        for collection_name, specs in self.specs.items():
+            try:
+                results[collection_name] = self._reconcile_collection(
+                    self.database[collection_name], specs, drop_unmanaged, dry_run
+                )
+            except Exception as e:
+                logger.warning(f"Failed to reconcile indexes for {collection_name}: {e}")
+
+        return results
+
+    def explain(self, shape: QueryShape) -> Dict[str, Any]:
+        """Explain one query shape and report the stages and indexes it uses"""
+        cursor = self.database[shape.collection].find(shape.filter).limit(100)
+        if shape.sort:
+            cursor = cursor.sort(shape.sort)
+        if shape.hint:
+            cursor = cursor.hint(shape.hint)
+
+        winning_plan = cursor.explain()['queryPlanner']['winningPlan']
+        stages = _plan_stages(winning_plan)
+
+        return {
+            'collection': shape.collection,
+            'covered': 'COLLSCAN' not in stages,
+            'blocking_sort': 'SORT' in stages,
+            'indexes': sorted(set(_plan_indexes(winning_plan))),
+            'stages': stages
+        }
+
+    def verify(self, shapes: List[QueryShape]) -> Dict[str, Dict[str, Any]]:
+        """Explain every query shape, flagging those answered by a collection scan"""
+        report = {}
+
+        for shape in shapes:
+            try:
+                report[shape.name] = self.explain(shape)
+            except Exception as e:
+                report[shape.name] = {'collection': shape.collection, 'covered': False, 'error': str(e)}
+
+            if not report[shape.name]['covered']:
+                logger.warning(f"Query shape '{shape.name}' is not covered by an index: {report[shape.name]}")
+
+        return report
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Database maintenance commands
+
+Periodic and on-demand housekeeping for the service monitoring database.
+
+Usage:
+    python -m database.maintenance rollup      # compact old logs into rollups
+    python -m database.maintenance indexes     # reconcile indexes (incl. TTL retention)
+    python -m database.maintenance verify-indexes  # explain query shapes, fail on COLLSCAN
+    python -m database.maintenance rebuild-stats  # recompute per-service counters
+    python -m database.maintenance rebuild-stats --if-needed  # backfill once, on deploy
+
+Run "rollup" from cron (e.g. every 15 minutes); it resumes from the last
+watermark and is safe to run repeatedly. Run "indexes" with the monitor's
+MONGO_*_RETENTION_DAYS set: TTL indexes of levels no longer retained are
+only dropped when retention is configured.
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Add the parent directory to Python path to import database module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import mongo_connection, log_operations, log_rollups
+
+def cmd_rollup(args) -> int:
+    """Roll raw logs up into hourly and daily buckets"""
+    result = log_rollups.run()
+    print(f"✅ Rolled up {result['hours']} hours and {result['days']} days")
+    return 0
+
+def cmd_indexes(args) -> int:
+    """Reconcile indexes with the declarative spec"""
+    result = mongo_connection.index_manager.reconcile(
+        drop_unmanaged=not args.keep_unmanaged,
+        dry_run=args.dry_run
+    )
+    for collection, changes in result.items():
+        print(f"📦 {collection}: {changes}")
+    return 0
+
+def cmd_verify_indexes(args) -> int:
+    """Explain every LogOperations query shape and fail if one needs a collection scan"""
+    report = mongo_connection.index_manager.verify(log_operations.query_shapes())
+    uncovered = [name for name, result in report.items() if not result['covered']]
+
+    for name, result in report.items():
+        marker = "✅" if result['covered'] else "❌"
+        details = result.get('error') or f"indexes={result['indexes']} blocking_sort={result['blocking_sort']}"
+        print(f"{marker} {name} ({result['collection']}): {details}")
+
+    if uncovered:
+        print(f"❌ {len(uncovered)} query shapes are not covered by an index")
+        return 1
+
+    print(f"✅ All {len(report)} query shapes use an index")
+    return 0
+
+def cmd_rebuild_stats(args) -> int:
+    """Recompute the per-service counters from raw logs"""
+    rebuilt = log_operations.backfill_service_stats() if args.if_needed else log_operations.rebuild_service_stats()
+    if rebuilt is None:
+        print("✅ Service counters already backfilled")
+        return 0
+
+    print(f"✅ Rebuilt counters for {rebuilt} services")
+    return 0
+
+def main() -> int:
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Service monitoring database maintenance")
+    parser.add_argument("--verbose", action="store_true", help="Enable debug logging")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("rollup", help="Compact old raw logs into hourly/daily rollups").set_defaults(func=cmd_rollup)
+    indexes_parser = subparsers.add_parser("indexes", help="Create missing and drop undeclared indexes")
+    indexes_parser.add_argument("--dry-run", action="store_true", help="Only report the changes")
+    indexes_parser.add_argument("--keep-unmanaged", action="store_true", help="Do not drop undeclared indexes")
+    indexes_parser.set_defaults(func=cmd_indexes)
+    subparsers.add_parser("verify-indexes", help="Check every query shape is served by an index").set_defaults(func=cmd_verify_indexes)
+    rebuild_parser = subparsers.add_parser("rebuild-stats", help="Rebuild per-service counters from raw logs")
+    rebuild_parser.add_argument("--if-needed", action="store_true", help="Only if the counters were never rebuilt (upgrades)")
+    rebuild_parser.set_defaults(func=cmd_rebuild_stats)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+
+    if not mongo_connection.connect():
+        print("❌ Failed to connect to MongoDB")
+        return 1
+
+    try:
+        return args.func(args)
+    finally:
+        mongo_connection.disconnect()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,37 @@
+import heapq
 import logging
+import uuid
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Union
-from pymongo.errors import PyMongoError
+from itertools import groupby, islice
+from typing import List, Dict, Any, Optional, Union, Iterator, Callable, Tuple
+from pymongo import UpdateOne, ReturnDocument
+from pymongo.collection import Collection
+from pymongo.errors import OperationFailure, PyMongoError
+from bson import ObjectId
 from .connection import mongo_connection
 from .models import LogEntry, EventEntry, LogLevel, ServiceStatus
+from .buckets import bucket_update, bucket_start_for, expand_bucket, bucket_entries_stages
+from .indexes import QueryShape, UNSENT_INDEX
+from .uptime import status_checks_filter
+from .pagination import (
+    decode_cursor, sort_key, before_position, after_position, encode_sync_token, decode_sync_token
+)
+from .rollups import (
+    log_rollups, plan_segments, ranges_filter, counts_group, window_index, time_bin, floor_bin,
+    LEVELS, STATUSES, HOUR, DAY
+)
 
 logger = logging.getLogger(__name__)
 
+# How far sync tokens and delivery cursors trail the query time, to cover writes still in flight
+SYNC_SAFETY_LAG = timedelta(seconds=5)
+
+# rollup_state document recording the last service_stats rebuild
+SERVICE_STATS_MARKER = 'service_stats'
+
+# Levels counted as errors by get_error_logs and the general statistics
+ERROR_LEVELS = [LogLevel.ERROR.value, LogLevel.WARNING.value, LogLevel.CRITICAL.value]
+
 class LogOperations:
     """MongoDB operations for logging system"""
 
@@ -26,6 +51,8 @@ class LogOperations:
 
             if result.inserted_id:
                 logger.debug(f"Log entry saved with ID: {result.inserted_id}")
+                self._update_service_stats([document])
+                self._update_current_state([document])
                 return True
             else:
                 logger.error("Failed to save log entry")
@@ -50,6 +77,8 @@ class LogOperations:
             result = collection.insert_many(documents)
 
             saved_count = len(result.inserted_ids)
+            self._update_service_stats(documents)
+            self._update_current_state(documents)
             logger.info(f"Batch saved {saved_count}/{len(log_entries)} log entries")
             return saved_count
 
@@ -60,6 +89,419 @@ class LogOperations:
             logger.error(f"Unexpected error saving batch logs: {e}")
             return 0
 
+    def save_status_check(self, log_entry: LogEntry) -> bool:
+        """Save a service status check
+
+        With MONGO_BUCKET_STATUS_CHECKS enabled, steady-state INFO checks
+        (same status and message as the previous check of the service_key)
+        are appended to an hourly bucket document instead of inserting one
+        log document each. Transitions and errors are still stored as
+        regular logs, so they keep being delivered through the unsent queue.
+        """
+        if (not self.connection.config.bucket_status_checks
+                or log_entry.log_level != LogLevel.INFO or log_entry.status is None):
+            return self.save_log(log_entry)
+
+        try:
+            logs_collection = self.connection.logs_collection
+            state_collection = self.connection.current_state_collection
+            buckets_collection = self.connection.status_buckets_collection
+            if logs_collection is None or state_collection is None or buckets_collection is None:
+                logger.error("Status check collections not available")
+                return False
+
+            document = log_entry.to_document()
+
+            # Update the live state and get the previous one in a single round trip
+            previous = state_collection.find_one_and_update(
+                {'_id': document['service_key']},
+                self._current_state_update(document),
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
+            )
+
+            steady = (
+                previous is not None
+                and previous.get('status') == document['status']
+                and previous.get('message') == document['message']
+                and previous.get('last_check', document['timestamp']) <= document['timestamp']
+            )
+
+            if not steady:
+                result = logs_collection.insert_one(document)
+                self._update_service_stats([document])
+                return bool(result.inserted_id)
+
+            bucket_filter, update = bucket_update(document)
+            buckets_collection.update_one(bucket_filter, update, upsert=True)
+
+            # Bucketed checks are history only, they never enter the unsent queue
+            document['sent_to_user'] = True
+            self._update_service_stats([document])
+
+            logger.debug(f"Status check bucketed for {document['service_key']}")
+            return True
+
+        except PyMongoError as e:
+            logger.error(f"MongoDB error saving status check: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"Unexpected error saving status check: {e}")
+            return False
+
+    def _reads_buckets(self, log_level: Optional[LogLevel] = None) -> bool:
+        """Whether a query has to read the bucketed status check layout"""
+        return self.connection.config.bucket_status_checks and log_level in (None, LogLevel.INFO)
+
+    def _iter_bucket_entries(
+        self,
+        service_name: Optional[str] = None,
+        host: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        descending: bool = True
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield bucketed status checks as log documents, newest first by default
+
+        Entries are ordered by (timestamp, _id) across every service_key:
+        buckets of the same hour overlap in time, so their expansions are
+        merged rather than chained.
+        """
+        collection = self.connection.status_buckets_collection
+        if collection is None:
+            return
+
+        bucket_filter: Dict[str, Any] = {}
+
+        if service_name:
+            bucket_filter['service_name'] = service_name
+
+        if host:
+            bucket_filter['host'] = host
+
+        if start_time or end_time:
+            time_filter = {}
+            if start_time:
+                time_filter['$gte'] = bucket_start_for(start_time)
+            if end_time:
+                time_filter['$lte'] = end_time
+            bucket_filter['bucket_start'] = time_filter
+
+        buckets = collection.find(bucket_filter).sort('bucket_start', -1 if descending else 1)
+        for _, hour_buckets in groupby(buckets, key=lambda bucket: bucket['bucket_start']):
+            yield from heapq.merge(
+                *(expand_bucket(bucket, start_time, end_time, descending=descending) for bucket in hour_buckets),
+                key=sort_key,
+                reverse=descending
+            )
+
+    def _service_stats_update(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Build the pipeline update folding one service's new logs into its counters"""
+        def literal(value):
+            return {'$literal': value}
+
+        def add(field, amount):
+            return {'$add': [{'$ifNull': [f'${field}', 0]}, amount]}
+
+        latest = max(documents, key=lambda doc: doc['timestamp'])
+        is_latest = {'$gte': [latest['timestamp'], {'$ifNull': ['$latest_timestamp', latest['timestamp']]}]}
+
+        fields: Dict[str, Any] = {
+            'total_logs': add('total_logs', len(documents)),
+            'unsent_logs': add('unsent_logs', sum(1 for doc in documents if not doc.get('sent_to_user'))),
+            'latest_timestamp': {'$max': ['$latest_timestamp', latest['timestamp']]},
+            'latest_level': {'$cond': [is_latest, literal(latest['log_level']), '$latest_level']},
+            'service_type': {'$cond': [is_latest, literal(latest['service_type']), '$service_type']},
+            'host': {'$cond': [is_latest, literal(latest['host']), '$host']}
+        }
+
+        for level in LEVELS:
+            count = sum(1 for doc in documents if doc['log_level'] == level)
+            if count:
+                fields[f'levels.{level}'] = add(f'levels.{level}', count)
+
+        # Only status checks carry a status, other logs must not clear it
+        with_status = [doc for doc in documents if doc.get('status')]
+        if with_status:
+            latest_check = max(with_status, key=lambda doc: doc['timestamp'])
+            is_latest_check = {'$gte': [
+                latest_check['timestamp'],
+                {'$ifNull': ['$latest_status_timestamp', latest_check['timestamp']]}
+            ]}
+            fields['latest_status'] = {'$cond': [is_latest_check, literal(latest_check['status']), '$latest_status']}
+            fields['latest_status_timestamp'] = {'$max': ['$latest_status_timestamp', latest_check['timestamp']]}
+
+        # Change markers for delta sync, see get_service_summary(since=...). Only
+        # the fields clients sync on count; counters move with every log write.
+        visible = ('latest_level', 'service_type', 'host', 'latest_status')
+        changed = {'$or': [{'$ne': [fields[field], f'${field}']} for field in visible if field in fields]}
+        fields['version'] = {'$cond': [changed, add('version', 1), '$version']}
+        fields['updated_at'] = {'$cond': [changed, '$$NOW', '$updated_at']}
+
+        return [{'$set': fields}]
+
+    def _update_service_stats(self, documents: List[Dict[str, Any]]):
+        """Maintain the per-service counters alongside each log write"""
+        try:
+            collection = self.connection.service_stats_collection
+            if collection is None or not documents:
+                return
+
+            by_service: Dict[str, List[Dict[str, Any]]] = {}
+            for document in documents:
+                by_service.setdefault(document['service_name'], []).append(document)
+
+            collection.bulk_write([
+                UpdateOne({'_id': service_name}, self._service_stats_update(service_documents), upsert=True)
+                for service_name, service_documents in by_service.items()
+            ], ordered=False)
+
+        except PyMongoError as e:
+            logger.warning(f"MongoDB error updating service stats: {e}")
+
+    def _current_state_update(self, document: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Build the pipeline update applying one status check to its service's state
+
+        Checks older than the stored one (late or re-imported writes) only
+        widen first_seen and never overwrite the live state.
+        """
+        def literal(value):
+            return {'$literal': value}
+
+        timestamp = document['timestamp']
+        status = document['status']
+        is_newer = {'$gte': [timestamp, {'$ifNull': ['$last_check', timestamp]}]}
+
+        def latest(field, value):
+            return {'$cond': [is_newer, literal(value), f'${field}']}
+
+        return [{
+            '$set': {
+                'service_key': literal(document['service_key']),
+                'service_name': latest('service_name', document['service_name']),
+                'service_type': latest('service_type', document['service_type']),
+                'host': latest('host', document['host']),
+                'status': latest('status', status),
+                'log_level': latest('log_level', document['log_level']),
+                'message': latest('message', document['message']),
+                'last_check': {'$max': ['$last_check', timestamp]},
+                'first_seen': {'$min': ['$first_seen', timestamp]},
+                'last_transition': {'$cond': [
+                    {'$and': [is_newer, {'$ne': ['$status', status]}]},
+                    timestamp,
+                    '$last_transition'
+                ]},
+                'consecutive_failures': {'$cond': [
+                    is_newer,
+                    {'$add': [{'$ifNull': ['$consecutive_failures', 0]}, 1]} if status != ServiceStatus.ACTIVE.value else 0,
+                    '$consecutive_failures'
+                ]},
+                'updated_at': '$$NOW'
+            }
+        }]
+
+    def _update_current_state(self, documents: List[Dict[str, Any]]):
+        """Upsert the live state of every service_key touched by new status checks"""
+        try:
+            collection = self.connection.current_state_collection
+            checks = sorted((doc for doc in documents if doc.get('status')), key=lambda doc: doc['timestamp'])
+            if collection is None or not checks:
+                return
+
+            # Ordered, so several checks of the same service apply oldest first
+            collection.bulk_write([
+                UpdateOne({'_id': doc['service_key']}, self._current_state_update(doc), upsert=True)
+                for doc in checks
+            ], ordered=True)
+
+        except PyMongoError as e:
+            logger.warning(f"MongoDB error updating current state: {e}")
+
+    def get_current_state(
+        self,
+        service_name: Optional[str] = None,
+        host: Optional[str] = None,
+        status: Optional[ServiceStatus] = None
+    ) -> List[Dict[str, Any]]:
+        """Get the live state of every monitored service_key"""
+        try:
+            collection = self.connection.current_state_collection
+            if collection is None:
+                logger.error("Current state collection not available")
+                return []
+
+            query_filter = {}
+
+            if service_name:
+                query_filter['service_name'] = service_name
+
+            if host:
+                query_filter['host'] = host
+
+            if status:
+                query_filter['status'] = status.value
+
+            # _id is the service_key, so the sort walks the _id index
+            return list(collection.find(query_filter, {'_id': 0}).sort('_id', 1))
+
+        except PyMongoError as e:
+            logger.error(f"MongoDB error querying current state: {e}")
+            return []
+
+    def _service_stats_stages(
+        self,
+        log_match: Dict[str, Any],
+        bucket_start: datetime,
+        bucket_end: datetime
+    ) -> List[Dict[str, Any]]:
+        """Aggregation stages computing service_stats documents from matching logs and bucket entries"""
+        has_status = {'$gt': ['$status', None]}
+        group: Dict[str, Any] = {
+            '_id': '$service_name',
+            'total_logs': {'$sum': 1},
+            'unsent_logs': {'$sum': {'$cond': [{'$eq': ['$sent_to_user', False]}, 1, 0]}},
+            'latest_timestamp': {'$max': '$timestamp'},
+            # Objects compare field by field, so the newest timestamp wins
+            'latest': {'$max': {'t': '$timestamp', 'level': '$log_level', 'type': '$service_type', 'host': '$host'}},
+            'latest_check': {'$max': {'$cond': [has_status, {'t': '$timestamp', 's': '$status'}, None]}}
+        }
+        for level in LEVELS:
+            group[f'level_{level}'] = {'$sum': {'$cond': [{'$eq': ['$log_level', level]}, 1, 0]}}
+
+        stages: List[Dict[str, Any]] = [{'$match': log_match}]
+        if self.connection.config.bucket_status_checks:
+            stages.append({'$unionWith': {
+                'coll': self.connection.config.status_buckets_collection,
+                'pipeline': bucket_entries_stages(bucket_start, bucket_end)
+            }})
+
+        return stages + [
+            {'$group': group},
+            {
+                '$project': {
+                    'total_logs': 1,
+                    'unsent_logs': 1,
+                    'latest_timestamp': 1,
+                    'latest_level': '$latest.level',
+                    'service_type': '$latest.type',
+                    'host': '$latest.host',
+                    'latest_status': '$latest_check.s',
+                    'latest_status_timestamp': '$latest_check.t',
+                    'levels': {
+                        '$arrayToObject': {'$filter': {
+                            'input': [{'k': level, 'v': f'$level_{level}'} for level in LEVELS],
+                            'cond': {'$gt': ['$$this.v', 0]}
+                        }}
+                    },
+                    'version': {'$literal': 1},
+                    'updated_at': '$$NOW'
+                }
+            }
+        ]
+
+    @staticmethod
+    def _service_stats_merge() -> List[Dict[str, Any]]:
+        """$merge whenMatched pipeline adding newer stats ($$new) to existing ones"""
+        def total(field):
+            return {'$add': [{'$ifNull': [f'${field}', 0]}, {'$ifNull': [f'$$new.{field}', 0]}]}
+
+        newer = {'$gte': ['$$new.latest_timestamp', '$latest_timestamp']}
+        newer_check = {'$gte': [
+            {'$ifNull': ['$$new.latest_status_timestamp', datetime.min]},
+            {'$ifNull': ['$latest_status_timestamp', datetime.min]}
+        ]}
+
+        return [{'$set': {
+            'total_logs': total('total_logs'),
+            'unsent_logs': total('unsent_logs'),
+            'latest_timestamp': {'$max': ['$latest_timestamp', '$$new.latest_timestamp']},
+            'latest_level': {'$cond': [newer, '$$new.latest_level', '$latest_level']},
+            'service_type': {'$cond': [newer, '$$new.service_type', '$service_type']},
+            'host': {'$cond': [newer, '$$new.host', '$host']},
+            'latest_status': {'$cond': [newer_check, '$$new.latest_status', '$latest_status']},
+            'latest_status_timestamp': {'$max': ['$latest_status_timestamp', '$$new.latest_status_timestamp']},
+            'levels': {
+                '$arrayToObject': {'$filter': {
+                    'input': [{'k': level, 'v': total(f'levels.{level}')} for level in LEVELS],
+                    'cond': {'$gt': ['$$this.v', 0]}
+                }}
+            },
+            'updated_at': '$$NOW'
+        }}]
+
+    def rebuild_service_stats(self) -> int:
+        """Rebuild the per-service counters collection from raw logs
+
+        Counters drift when logs are removed outside this class (TTL
+        retention, manual deletes); this recomputes them from scratch,
+        bucketed status checks included.
+
+        Safe while the monitor keeps writing: history up to a boundary is
+        aggregated into a staging collection, logs written since then are
+        merged in with a second, short pass, and only then is staging
+        renamed over service_stats. Writes landing between that second
+        pass and the rename, and deliveries acknowledged while it runs,
+        can still leave counters off until the next rebuild.
+        """
+        try:
+            collection = self.connection.logs_collection
+            database = self.connection.database
+            if collection is None or database is None:
+                logger.error("Logs collection not available")
+                return 0
+
+            config = self.connection.config
+            staging = database[f"{config.service_stats_collection}_rebuild"]
+            staging.drop()
+            # $out keeps the indexes of an existing target, so staging is swapped in fully indexed
+            self.connection.index_manager.create_declared(staging, config.service_stats_collection)
+
+            # ObjectIds carry their creation second; the lag covers inserts still in flight
+            boundary = (datetime.utcnow() - SYNC_SAFETY_LAG).replace(microsecond=0)
+            boundary_id = ObjectId.from_datetime(boundary)
+
+            history = self._service_stats_stages({'_id': {'$lt': boundary_id}}, datetime.min, boundary)
+            list(collection.aggregate(history + [{'$out': staging.name}], allowDiskUse=True))
+
+            recent = self._service_stats_stages({'_id': {'$gte': boundary_id}}, boundary, datetime.max)
+            list(collection.aggregate(recent + [{'$merge': {
+                'into': staging.name,
+                'on': '_id',
+                'whenMatched': self._service_stats_merge(),
+                'whenNotMatched': 'insert'
+            }}], allowDiskUse=True))
+
+            staging.rename(config.service_stats_collection, dropTarget=True)
+            rebuilt = self.connection.service_stats_collection.estimated_document_count()
+
+            # Migration marker: databases that predate service_stats are backfilled once
+            self.connection.rollup_state_collection.update_one(
+                {'_id': SERVICE_STATS_MARKER},
+                {'$set': {'rebuilt_at': datetime.utcnow(), 'services': rebuilt}},
+                upsert=True
+            )
+
+            logger.info(f"Rebuilt service stats for {rebuilt} services")
+            return rebuilt
+
+        except PyMongoError as e:
+            logger.error(f"MongoDB error rebuilding service stats: {e}")
+            return 0
+
+    def service_stats_rebuilt(self) -> bool:
+        """Whether service_stats was ever rebuilt from history, see maintenance rebuild-stats"""
+        collection = self.connection.rollup_state_collection
+        if collection is None:
+            return False
+
+        return collection.find_one({'_id': SERVICE_STATS_MARKER}, {'_id': 1}) is not None
+
+    def backfill_service_stats(self) -> Optional[int]:
+        """Rebuild service_stats once for databases that predate it; None when already done"""
+        if self.service_stats_rebuilt():
+            return None
+        return self.rebuild_service_stats()
+
     def save_event(self, event_entry: EventEntry) -> bool:
         """Save an event entry to MongoDB"""
         try:
@@ -85,6 +527,110 @@ class LogOperations:
             logger.error(f"Unexpected error saving event: {e}")
             return False
 
+    def _projection(self, fields: Optional[List[str]]) -> Optional[Dict[str, int]]:
+        """Build a find() projection, keeping the (timestamp, _id) position fields for paging"""
+        if not fields:
+            return None
+
+        projection = {field: 1 for field in fields}
+        projection['timestamp'] = 1
+        return projection
+
+    def _project_entry(self, entry: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+        """Apply a projection to an expanded bucket entry, which never went through find()"""
+        if not fields:
+            return entry
+
+        kept = {field.split('.')[0] for field in fields} | {'_id', 'timestamp'}
+        return {key: value for key, value in entry.items() if key in kept}
+
+    def _build_log_filter(
+        self,
+        service_name: Optional[str] = None,
+        log_level: Optional[LogLevel] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        host: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the logs query filter shared by the query methods"""
+        query_filter = {}
+
+        if service_name:
+            query_filter['service_name'] = service_name
+
+        if log_level:
+            query_filter['log_level'] = log_level.value
+
+        if host:
+            query_filter['host'] = host
+
+        if start_time or end_time:
+            time_filter = {}
+            if start_time:
+                time_filter['$gte'] = start_time
+            if end_time:
+                time_filter['$lte'] = end_time
+            query_filter['timestamp'] = time_filter
+
+        return query_filter
+
+    def _build_event_filter(
+        self,
+        service_name: Optional[str] = None,
+        event_type: Optional[str] = None,
+        severity: Optional[LogLevel] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        host: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the events query filter"""
+        query_filter = {}
+
+        if service_name:
+            query_filter['service_name'] = service_name
+
+        if event_type:
+            query_filter['event_type'] = event_type
+
+        if severity:
+            query_filter['severity'] = severity.value
+
+        if host:
+            query_filter['host'] = host
+
+        if start_time or end_time:
+            time_filter = {}
+            if start_time:
+                time_filter['$gte'] = start_time
+            if end_time:
+                time_filter['$lte'] = end_time
+            query_filter['timestamp'] = time_filter
+
+        return query_filter
+
+    def _error_logs_filter(self, start_time: datetime, end_time: datetime) -> Dict[str, Any]:
+        """Build the filter selecting warnings and errors in a time range"""
+        return {
+            'log_level': {'$in': ERROR_LEVELS},
+            'timestamp': {'$gte': start_time, '$lte': end_time}
+        }
+
+    def _unsent_filter(
+        self,
+        service_name: Optional[str] = None,
+        log_level: Optional[LogLevel] = None
+    ) -> Dict[str, Any]:
+        """Build the unsent logs filter, which must match the unsent_queue partial index"""
+        query_filter: Dict[str, Any] = {'sent_to_user': False}
+
+        if service_name:
+            query_filter['service_name'] = service_name
+
+        if log_level:
+            query_filter['log_level'] = log_level.value
+
+        return query_filter
+
     def get_logs(
         self,
         service_name: Optional[str] = None,
@@ -93,38 +639,51 @@ class LogOperations:
         end_time: Optional[datetime] = None,
         host: Optional[str] = None,
         limit: int = 100,
-        skip: int = 0
+        skip: int = 0,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
-        """Query logs with various filters"""
+        """Query logs with various filters, newest first
+
+        cursor is a page token (see database.pagination) continuing after the
+        last log of the previous page; prefer it over skip for deep pages.
+        fields limits the returned fields (_id and timestamp are always kept).
+        Raises ValueError for a malformed cursor.
+        """
+        position = decode_cursor(cursor) if cursor else None
+
         try:
             collection = self.connection.logs_collection
             if collection is None:
                 logger.error("Logs collection not available")
                 return []
 
-            # Build query filter
-            query_filter = {}
-
-            if service_name:
-                query_filter['service_name'] = service_name
-
-            if log_level:
-                query_filter['log_level'] = log_level.value
-
-            if host:
-                query_filter['host'] = host
-
-            if start_time or end_time:
-                time_filter = {}
-                if start_time:
-                    time_filter['$gte'] = start_time
-                if end_time:
-                    time_filter['$lte'] = end_time
-                query_filter['timestamp'] = time_filter
-
-            # Execute query
-            cursor = collection.find(query_filter).sort('timestamp', -1).skip(skip).limit(limit)
-            results = list(cursor)
+            query_filter = self._build_log_filter(service_name, log_level, start_time, end_time, host)
+            if position:
+                query_filter.update(before_position(position))
+
+            # Execute query, _id breaks timestamp ties so pages never overlap
+            logs_cursor = collection.find(query_filter, self._projection(fields)).sort([('timestamp', -1), ('_id', -1)])
+
+            if self._reads_buckets(log_level):
+                bucket_entries = self._iter_bucket_entries(
+                    service_name, host, start_time, position[0] if position else end_time
+                )
+                if position:
+                    bucket_entries = (entry for entry in bucket_entries if sort_key(entry) < sort_key(
+                        {'timestamp': position[0], '_id': position[1]}
+                    ))
+
+                # Merge both layouts by position, paging client-side
+                merged = heapq.merge(
+                    logs_cursor.limit(skip + limit),
+                    bucket_entries,
+                    key=sort_key,
+                    reverse=True
+                )
+                results = [self._project_entry(doc, fields) for doc in islice(merged, skip, skip + limit)]
+            else:
+                results = list(logs_cursor.skip(skip).limit(limit))
 
             logger.debug(f"Retrieved {len(results)} log entries")
             return results
@@ -136,7 +695,13 @@ class LogOperations:
             logger.error(f"Unexpected error querying logs: {e}")
             return []
 
-    def get_recent_logs(self, service_name: str, hours: int = 24, limit: int = 100) -> List[Dict[str, Any]]:
+    def get_recent_logs(
+        self,
+        service_name: str,
+        hours: int = 24,
+        limit: int = 100,
+        fields: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
         """Get recent logs for a specific service"""
         end_time = datetime.utcnow()
         start_time = end_time - timedelta(hours=hours)
@@ -145,10 +710,11 @@ class LogOperations:
             service_name=service_name,
             start_time=start_time,
             end_time=end_time,
-            limit=limit
+            limit=limit,
+            fields=fields
         )
 
-    def get_error_logs(self, hours: int = 24, limit: int = 50) -> List[Dict[str, Any]]:
+    def get_error_logs(self, hours: int = 24, limit: int = 50, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Get recent error and warning logs"""
         end_time = datetime.utcnow()
         start_time = end_time - timedelta(hours=hours)
@@ -158,54 +724,193 @@ class LogOperations:
             if collection is None:
                 return []
 
-            query_filter = {
-                'log_level': {'$in': [LogLevel.ERROR.value, LogLevel.WARNING.value, LogLevel.CRITICAL.value]},
-                'timestamp': {'$gte': start_time, '$lte': end_time}
-            }
+            query_filter = self._error_logs_filter(start_time, end_time)
 
-            cursor = collection.find(query_filter).sort('timestamp', -1).limit(limit)
+            cursor = collection.find(query_filter, self._projection(fields)).sort('timestamp', -1).limit(limit)
             return list(cursor)
 
         except PyMongoError as e:
             logger.error(f"MongoDB error querying error logs: {e}")
             return []
 
-    def get_service_statistics(self, service_name: str, hours: int = 24) -> Dict[str, Any]:
-        """Get statistics for a specific service"""
+    def _stream(self, documents: Iterator[Dict[str, Any]], batch_size: int, chunked: bool) -> Iterator[Any]:
+        """Yield documents one by one, or as lists of up to batch_size"""
+        if not chunked:
+            yield from documents
+            return
+
+        while True:
+            chunk = list(islice(documents, batch_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def iter_logs(
+        self,
+        service_name: Optional[str] = None,
+        log_level: Optional[LogLevel] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        host: Optional[str] = None,
+        batch_size: int = 1000,
+        chunked: bool = False
+    ) -> Iterator[Any]:
+        """Stream logs oldest first without materializing the result
+
+        The cursor fetches batch_size documents per round trip, so memory
+        stays bounded whatever the result size. With chunked, lists of up
+        to batch_size documents are yielded instead of single documents.
+        A PyMongoError midway is raised, not swallowed, so a truncated
+        stream is never taken for a complete one.
+        """
+        try:
+            collection = self.connection.logs_collection
+            if collection is None:
+                logger.error("Logs collection not available")
+                return
+
+            query_filter = self._build_log_filter(service_name, log_level, start_time, end_time, host)
+            documents = collection.find(query_filter).sort([('timestamp', 1), ('_id', 1)]).batch_size(batch_size)
+
+            if self._reads_buckets(log_level):
+                documents = heapq.merge(
+                    documents,
+                    self._iter_bucket_entries(service_name, host, start_time, end_time, descending=False),
+                    key=sort_key
+                )
+
+            yield from self._stream(documents, batch_size, chunked)
+
+        except PyMongoError as e:
+            logger.error(f"MongoDB error streaming logs: {e}")
+            raise
+
+    def iter_events(
+        self,
+        service_name: Optional[str] = None,
+        event_type: Optional[str] = None,
+        severity: Optional[LogLevel] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        host: Optional[str] = None,
+        batch_size: int = 1000,
+        chunked: bool = False
+    ) -> Iterator[Any]:
+        """Stream events oldest first without materializing the result, see iter_logs"""
+        try:
+            collection = self.connection.events_collection
+            if collection is None:
+                logger.error("Events collection not available")
+                return
+
+            query_filter = self._build_event_filter(service_name, event_type, severity, start_time, end_time, host)
+            documents = collection.find(query_filter).sort('timestamp', 1).batch_size(batch_size)
+
+            yield from self._stream(documents, batch_size, chunked)
+
+        except PyMongoError as e:
+            logger.error(f"MongoDB error streaming events: {e}")
+            raise
+
+    def _aggregate_segments(
+        self,
+        service_name: str,
+        plan: Dict[str, List[Tuple[datetime, datetime]]],
+        group_key: Callable[[bool], Any]
+    ) -> List[Dict[str, Any]]:
+        """Count a service's logs over a plan_segments plan, grouped by group_key
+
+        Raw ranges are read from logs (and status buckets), the others from
+        the hourly and daily rollups. group_key gets whether the source is a
+        rollup and returns the $group _id expression for it.
+        """
+        sources = [
+            (self.connection.logs_collection, plan['raw'], 'timestamp', False),
+            (self.connection.hourly_rollups_collection, plan['hourly'], 'bucket', True),
+            (self.connection.daily_rollups_collection, plan['daily'], 'bucket', True)
+        ]
+
+        results = []
+        for source, ranges, field, from_rollups in sources:
+            if not ranges:
+                continue
+
+            pipeline = [{'$match': {'service_name': service_name, **ranges_filter(field, ranges)}}]
+
+            if not from_rollups and self._reads_buckets():
+                pipeline.append({'$unionWith': {
+                    'coll': self.connection.config.status_buckets_collection,
+                    'pipeline': bucket_entries_stages(
+                        ranges[0][0],
+                        ranges[-1][1],
+                        service_name=service_name,
+                        timestamp_match=ranges_filter('timestamp', ranges)
+                    )
+                }})
+
+            pipeline.append(counts_group(from_rollups, group_key(from_rollups)))
+            results.extend(source.aggregate(pipeline))
+
+        return results
+
+    def get_service_statistics(
+        self,
+        service_name: str,
+        hours: int = 24,
+        windows: Optional[List[int]] = None
+    ) -> Dict[str, Any]:
+        """Get statistics for a specific service
+
+        Whole hours and days already rolled up are read from the rollup
+        collections, raw logs only for the recent edge and partial hours,
+        so long windows cost about the same as short ones.
+
+        windows (in hours, all ending now) are computed in the same pass
+        over the widest one and returned under 'windows' keyed like "24h";
+        the top-level figures are those of the widest window.
+        """
         try:
             collection = self.connection.logs_collection
             if collection is None:
                 return {}
 
+            window_hours = sorted(set(windows)) if windows else [hours]
             end_time = datetime.utcnow()
-            start_time = end_time - timedelta(hours=hours)
+            window_starts = [end_time - timedelta(hours=h) for h in window_hours]
+            start_time = window_starts[-1]
+
+            watermarks = log_rollups.get_watermarks()
+            plan = plan_segments(
+                start_time,
+                end_time,
+                boundaries=window_starts,
+                hourly_until=watermarks['hourly'],
+                daily_until=watermarks['daily']
+            )
 
-            pipeline = [
-                {
-                    '$match': {
-                        'service_name': service_name,
-                        'timestamp': {'$gte': start_time, '$lte': end_time}
-                    }
-                },
-                {
-                    '$group': {
-                        '_id': '$log_level',
-                        'count': {'$sum': 1},
-                        'latest': {'$max': '$timestamp'}
-                    }
-                }
-            ]
+            results = self._aggregate_segments(
+                service_name, plan, lambda from_rollups: window_index(from_rollups, window_starts)
+            )
 
-            results = list(collection.aggregate(pipeline))
+            breakdowns = {}
+            for index, h in enumerate(window_hours):
+                # A window holds its own group and those of every narrower window
+                window_results = [r for r in results if r['_id'] <= index]
+                by_level = {level: sum(r[f'level_{level}'] for r in window_results) for level in LEVELS}
+                by_status = {status: sum(r[f'status_{status}'] for r in window_results) for status in STATUSES}
+
+                breakdowns[f'{h}h'] = {
+                    'period_hours': h,
+                    'total_logs': sum(r['count'] for r in window_results),
+                    'by_level': {level: count for level, count in by_level.items() if count},
+                    'by_status': {status: count for status, count in by_status.items() if count},
+                    'latest_activity': max((r['latest'] for r in window_results if r['latest']), default=None)
+                }
 
             # Format statistics
-            stats = {
-                'service_name': service_name,
-                'period_hours': hours,
-                'total_logs': sum(r['count'] for r in results),
-                'by_level': {r['_id']: r['count'] for r in results},
-                'latest_activity': max((r['latest'] for r in results), default=None)
-            }
+            stats = {'service_name': service_name, **breakdowns[f'{window_hours[-1]}h']}
+            if windows:
+                stats['windows'] = breakdowns
 
             return stats
 
@@ -213,8 +918,78 @@ class LogOperations:
             logger.error(f"MongoDB error getting service statistics: {e}")
             return {}
 
+    def get_service_timeseries(
+        self,
+        service_name: str,
+        hours: int = 24,
+        bucket_size: timedelta = timedelta(minutes=5)
+    ) -> Dict[str, Any]:
+        """Get counts by level and status in fixed time buckets, as parallel arrays
+
+        Buckets are aligned like $dateTrunc and the first one starts at or
+        before now - hours. Bucket sizes of whole hours read the hourly and
+        daily rollups for rolled-up history; smaller ones read raw logs.
+        """
+        try:
+            collection = self.connection.logs_collection
+            if collection is None:
+                return {}
+
+            end_time = datetime.utcnow()
+            start_time = floor_bin(end_time - timedelta(hours=hours), bucket_size)
+            bin_starts = []
+            bin_start = start_time
+            while bin_start <= end_time:
+                bin_starts.append(bin_start)
+                bin_start += bucket_size
+
+            # A rollup bucket must fall entirely inside one time bucket to be usable
+            watermarks = log_rollups.get_watermarks()
+            hourly_bins = bucket_size % HOUR == timedelta(0)
+            plan = plan_segments(
+                start_time,
+                end_time,
+                boundaries=bin_starts if hourly_bins else (),
+                hourly_until=watermarks['hourly'] if hourly_bins else None,
+                daily_until=watermarks['daily'] if bucket_size % DAY == timedelta(0) else None
+            )
+
+            results = self._aggregate_segments(
+                service_name, plan, lambda from_rollups: time_bin(from_rollups, bucket_size)
+            )
+
+            # Several sources can report the same bin, so sum into the full (zero-filled) axis
+            positions = {bin_start: index for index, bin_start in enumerate(bin_starts)}
+            total = [0] * len(bin_starts)
+            levels = {level: [0] * len(bin_starts) for level in LEVELS}
+            statuses = {status: [0] * len(bin_starts) for status in STATUSES}
+
+            for result in results:
+                index = positions.get(result['_id'])
+                if index is None:
+                    continue
+                total[index] += result['count']
+                for level in LEVELS:
+                    levels[level][index] += result[f'level_{level}']
+                for status in STATUSES:
+                    statuses[status][index] += result[f'status_{status}']
+
+            return {
+                'service_name': service_name,
+                'period_hours': hours,
+                'bucket_seconds': int(bucket_size.total_seconds()),
+                'timestamps': [bin_start.isoformat() for bin_start in bin_starts],
+                'total': total,
+                'by_level': {level: counts for level, counts in levels.items() if any(counts)},
+                'by_status': {status: counts for status, counts in statuses.items() if any(counts)}
+            }
+
+        except PyMongoError as e:
+            logger.error(f"MongoDB error getting service timeseries: {e}")
+            return {}
+
     def delete_old_logs(self, days_to_keep: int = 30) -> int:
-        """Delete old log entries to manage storage"""
+        """Delete old log entries once; routine retention uses the MONGO_LOGS_RETENTION_DAYS TTL indexes"""
         try:
             collection = self.connection.logs_collection
             if collection is None:
@@ -232,31 +1007,58 @@ class LogOperations:
             logger.error(f"MongoDB error deleting old logs: {e}")
             return 0
 
+    def _find_unsent(
+        self,
+        collection: Collection,
+        query_filter: Dict[str, Any],
+        projection: Optional[Dict[str, int]],
+        sort: List[tuple],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Query the unsent queue through its partial index
+
+        Without the index the hint fails; the query then runs unhinted
+        rather than leaving the queue looking empty.
+        """
+        try:
+            return list(collection.find(query_filter, projection).sort(sort).hint(UNSENT_INDEX).limit(limit))
+        except OperationFailure as e:
+            if 'hint' not in str(e).lower():
+                raise
+            logger.error(f"Index {UNSENT_INDEX} missing, querying unsent logs without it "
+                         f"(run 'python -m database.maintenance indexes'): {e}")
+            return list(collection.find(query_filter, projection).sort(sort).limit(limit))
+
     def get_unsent_logs(
         self,
         service_name: Optional[str] = None,
         log_level: Optional[LogLevel] = None,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
-        """Get logs that haven't been sent to user yet"""
+        """Get logs that haven't been sent to user yet
+
+        Served from the partial unsent_queue index, which only holds unsent
+        documents, so polling cost follows the backlog, not the history.
+        cursor and fields work as in get_logs.
+        """
+        position = decode_cursor(cursor) if cursor else None
+
         try:
             collection = self.connection.logs_collection
             if collection is None:
                 logger.error("Logs collection not available")
                 return []
 
-            # Build query filter for unsent logs
-            query_filter = {'sent_to_user': False}
-
-            if service_name:
-                query_filter['service_name'] = service_name
-
-            if log_level:
-                query_filter['log_level'] = log_level.value
+            query_filter = self._unsent_filter(service_name, log_level)
+            if position:
+                query_filter.update(before_position(position))
 
             # Execute query
-            cursor = collection.find(query_filter).sort('timestamp', -1).limit(limit)
-            results = list(cursor)
+            results = self._find_unsent(
+                collection, query_filter, self._projection(fields), [('timestamp', -1), ('_id', -1)], limit
+            )
 
             logger.debug(f"Retrieved {len(results)} unsent log entries")
             return results
@@ -276,8 +1078,6 @@ class LogOperations:
                 logger.error("Logs collection not available")
                 return 0
 
-            from bson import ObjectId
-
             # Convert string IDs to ObjectId
             object_ids = []
             for log_id in log_ids:
@@ -289,13 +1089,21 @@ class LogOperations:
             if not object_ids:
                 return 0
 
+            # Group by service so the unsent counters can be decremented exactly
+            ids_by_service: Dict[str, List[Any]] = {}
+            for doc in collection.find({'_id': {'$in': object_ids}, 'sent_to_user': False}, {'service_name': 1}):
+                ids_by_service.setdefault(doc['service_name'], []).append(doc['_id'])
+
             # Update logs to mark as sent
-            result = collection.update_many(
-                {'_id': {'$in': object_ids}},
-                {'$set': {'sent_to_user': True}}
-            )
+            updated_count = 0
+            for service_name, service_ids in ids_by_service.items():
+                result = collection.update_many(
+                    {'_id': {'$in': service_ids}, 'sent_to_user': False},
+                    {'$set': {'sent_to_user': True}}
+                )
+                updated_count += result.modified_count
+                self._decrement_unsent(service_name, result.modified_count)
 
-            updated_count = result.modified_count
             logger.debug(f"Marked {updated_count} logs as sent")
             return updated_count
 
@@ -306,39 +1114,421 @@ class LogOperations:
             logger.error(f"Unexpected error marking logs as sent: {e}")
             return 0
 
-    def get_service_summary(self) -> Dict[str, Any]:
-        """Get summary of all services and their status"""
+    def _claimable_filter(
+        self,
+        now: datetime,
+        service_name: Optional[str] = None,
+        log_level: Optional[LogLevel] = None
+    ) -> Dict[str, Any]:
+        """Build the filter selecting unsent logs without a live lease"""
+        query_filter = self._unsent_filter(service_name, log_level)
+        # Matches logs never leased as well as logs whose lease expired
+        query_filter['lease_expires'] = {'$not': {'$gte': now}}
+        return query_filter
+
+    def claim_unsent_logs(
+        self,
+        consumer: str,
+        limit: int = 100,
+        visibility_timeout: int = 60,
+        service_name: Optional[str] = None,
+        log_level: Optional[LogLevel] = None
+    ) -> Dict[str, Any]:
+        """Lease a batch of unsent logs to a consumer
+
+        Leased logs are hidden from other claims for visibility_timeout
+        seconds. The consumer acknowledges the whole batch with
+        ack_lease(lease_id); if it does not, the logs become claimable again
+        once the lease expires. Returns the lease id, its expiry and the logs.
+        """
         try:
             collection = self.connection.logs_collection
             if collection is None:
+                logger.error("Logs collection not available")
                 return {}
 
-            pipeline = [
-                {
-                    '$group': {
-                        '_id': '$service_name',
-                        'total_logs': {'$sum': 1},
-                        'unsent_logs': {
-                            '$sum': {'$cond': [{'$eq': ['$sent_to_user', False]}, 1, 0]}
-                        },
-                        'latest_timestamp': {'$max': '$timestamp'},
-                        'latest_status': {'$last': '$status'},
-                        'latest_level': {'$last': '$log_level'},
-                        'service_type': {'$last': '$service_type'},
-                        'host': {'$last': '$host'}
+            now = datetime.utcnow()
+            lease_id = uuid.uuid4().hex
+            expires_at = now + timedelta(seconds=visibility_timeout)
+            claimable = self._claimable_filter(now, service_name, log_level)
+
+            claimed = 0
+            while claimed < limit:
+                # Oldest first, so the backlog drains in order
+                candidates = [
+                    doc['_id'] for doc in
+                    self._find_unsent(collection, claimable, {'_id': 1}, [('timestamp', 1)], limit - claimed)
+                ]
+                if not candidates:
+                    break
+
+                # Re-checking the claimable filter makes concurrent claims skip each other's logs;
+                # candidates another consumer took are replaced on the next round
+                result = collection.update_many(
+                    {'_id': {'$in': candidates}, **claimable},
+                    {'$set': {'lease_id': lease_id, 'lease_owner': consumer, 'lease_expires': expires_at}}
+                )
+                claimed += result.modified_count
+
+            logs = list(collection.find({'lease_id': lease_id}).sort('timestamp', 1)) if claimed else []
+
+            logger.debug(f"Consumer {consumer} claimed {len(logs)} logs under lease {lease_id}")
+            return {
+                'lease_id': lease_id if logs else None,
+                'consumer': consumer,
+                'expires_at': expires_at,
+                'logs': logs
+            }
+
+        except PyMongoError as e:
+            logger.error(f"MongoDB error claiming unsent logs: {e}")
+            return {}
+        except Exception as e:
+            logger.error(f"Unexpected error claiming unsent logs: {e}")
+            return {}
+
+    def ack_lease(self, lease_id: str) -> int:
+        """Mark every log held by a lease as sent to user"""
+        try:
+            collection = self.connection.logs_collection
+            if collection is None:
+                logger.error("Logs collection not available")
+                return 0
+
+            acked_count = 0
+            # Per service, so the unsent counters can be decremented exactly
+            for service_name in collection.distinct('service_name', {'lease_id': lease_id}):
+                result = collection.update_many(
+                    {'lease_id': lease_id, 'service_name': service_name, 'sent_to_user': False},
+                    {
+                        '$set': {'sent_to_user': True},
+                        '$unset': {'lease_id': '', 'lease_owner': '', 'lease_expires': ''}
                     }
+                )
+                acked_count += result.modified_count
+                self._decrement_unsent(service_name, result.modified_count)
+
+            logger.debug(f"Acknowledged {acked_count} logs of lease {lease_id}")
+            return acked_count
+
+        except PyMongoError as e:
+            logger.error(f"MongoDB error acknowledging lease: {e}")
+            return 0
+
+    def release_lease(self, lease_id: str) -> int:
+        """Give the logs of a lease back to the queue without marking them as sent"""
+        try:
+            collection = self.connection.logs_collection
+            if collection is None:
+                logger.error("Logs collection not available")
+                return 0
+
+            result = collection.update_many(
+                {'lease_id': lease_id},
+                {'$unset': {'lease_id': '', 'lease_owner': '', 'lease_expires': ''}}
+            )
+
+            logger.debug(f"Released {result.modified_count} logs of lease {lease_id}")
+            return result.modified_count
+
+        except PyMongoError as e:
+            logger.error(f"MongoDB error releasing lease: {e}")
+            return 0
+
+    def register_cursor(
+        self,
+        consumer: str,
+        service_name: Optional[str] = None,
+        log_level: Optional[LogLevel] = None,
+        start_from_now: bool = False
+    ) -> Dict[str, Any]:
+        """Create (or reset) a consumer's delivery cursor
+
+        The cursor is the high-water mark of the (timestamp, _id) positions
+        the consumer has processed; everything after it is undelivered for
+        that consumer. Filters are fixed per cursor so the mark stays valid.
+        start_from_now starts SYNC_SAFETY_LAG back, like every cursor read.
+        """
+        try:
+            collection = self.connection.delivery_cursors_collection
+            if collection is None:
+                logger.error("Delivery cursors collection not available")
+                return {}
+
+            now = datetime.utcnow()
+            cursor = {
+                '_id': consumer,
+                # Highest possible ObjectId, so nothing already written at the start is delivered
+                'timestamp': now - SYNC_SAFETY_LAG if start_from_now else None,
+                'last_id': ObjectId('f' * 24) if start_from_now else None,
+                'filters': {
+                    'service_name': service_name,
+                    'log_level': log_level.value if log_level else None
                 },
-                {
-                    '$sort': {'latest_timestamp': -1}
-                }
+                'created_at': now,
+                'updated_at': now
+            }
+
+            collection.replace_one({'_id': consumer}, cursor, upsert=True)
+            return cursor
+
+        except PyMongoError as e:
+            logger.error(f"MongoDB error registering delivery cursor: {e}")
+            return {}
+
+    def get_cursor(self, consumer: str) -> Optional[Dict[str, Any]]:
+        """Get a consumer's delivery cursor"""
+        try:
+            collection = self.connection.delivery_cursors_collection
+            if collection is None:
+                return None
+            return collection.find_one({'_id': consumer})
+
+        except PyMongoError as e:
+            logger.error(f"MongoDB error getting delivery cursor: {e}")
+            return None
+
+    def get_logs_after_cursor(self, consumer: str, limit: int = 100) -> Optional[List[Dict[str, Any]]]:
+        """Get the next logs a consumer has not processed yet, oldest first
+
+        Reading does not move the cursor; call ack_cursor with the last log
+        processed. Returns None for a consumer never registered with
+        register_cursor, so a mistyped name is not silently registered.
+
+        Logs stamped within SYNC_SAFETY_LAG of now are held back, so a log
+        written late with an older timestamp is not skipped by a cursor
+        already past it. Logs stored later than that after their timestamp
+        (clock skew, buffered writers) can still be missed.
+        """
+        try:
+            collection = self.connection.logs_collection
+            if collection is None:
+                logger.error("Logs collection not available")
+                return []
+
+            cursor = self.get_cursor(consumer)
+            if cursor is None:
+                return None
+
+            filters = cursor.get('filters', {})
+            level = filters.get('log_level')
+
+            query_filter = self._build_log_filter(
+                service_name=filters.get('service_name'),
+                log_level=LogLevel(level) if level else None
+            )
+            if cursor.get('timestamp') is not None:
+                query_filter.update(after_position((cursor['timestamp'], cursor['last_id'])))
+
+            query_filter['timestamp'] = {'$lte': datetime.utcnow() - SYNC_SAFETY_LAG}
+
+            results = list(collection.find(query_filter).sort([('timestamp', 1), ('_id', 1)]).limit(limit))
+
+            logger.debug(f"Retrieved {len(results)} logs after cursor of {consumer}")
+            return results
+
+        except PyMongoError as e:
+            logger.error(f"MongoDB error querying logs after cursor: {e}")
+            return []
+        except Exception as e:
+            logger.error(f"Unexpected error querying logs after cursor: {e}")
+            return []
+
+    def ack_cursor(self, consumer: str, log_id: str) -> bool:
+        """Advance a consumer's cursor up to and including a processed log
+
+        One small update whatever the batch size. The cursor only moves
+        forward, so late or repeated acks are harmless, and never past the
+        SYNC_SAFETY_LAG horizon of get_logs_after_cursor.
+        """
+        try:
+            logs_collection = self.connection.logs_collection
+            cursors_collection = self.connection.delivery_cursors_collection
+            if logs_collection is None or cursors_collection is None:
+                logger.error("Delivery collections not available")
+                return False
+
+            try:
+                object_id = ObjectId(log_id)
+            except Exception as e:
+                logger.warning(f"Invalid ObjectId: {log_id} - {e}")
+                return False
+
+            log = logs_collection.find_one({'_id': object_id}, {'timestamp': 1})
+            if log is None:
+                return False
+
+            timestamp = log['timestamp']
+            horizon = datetime.utcnow() - SYNC_SAFETY_LAG
+            if timestamp > horizon:
+                # Logs up to the horizon may still arrive; this one is delivered again later
+                timestamp, object_id = horizon, ObjectId('0' * 24)
+
+            result = cursors_collection.update_one(
+                {'_id': consumer, '$or': [
+                    {'timestamp': None},
+                    {'timestamp': {'$lt': timestamp}},
+                    {'timestamp': timestamp, 'last_id': {'$lt': object_id}}
+                ]},
+                {'$set': {'timestamp': timestamp, 'last_id': object_id, 'updated_at': datetime.utcnow()}}
+            )
+
+            return result.modified_count > 0
+
+        except PyMongoError as e:
+            logger.error(f"MongoDB error acknowledging cursor: {e}")
+            return False
+
+    def list_cursors(self) -> List[Dict[str, Any]]:
+        """Get every consumer's delivery cursor"""
+        try:
+            collection = self.connection.delivery_cursors_collection
+            if collection is None:
+                return []
+            return list(collection.find({}).sort('_id', 1))
+
+        except PyMongoError as e:
+            logger.error(f"MongoDB error listing delivery cursors: {e}")
+            return []
+
+    def _decrement_unsent(self, service_name: str, count: int):
+        """Keep the per-service unsent counter in step with delivered logs"""
+        if not count:
+            return
+
+        try:
+            self.connection.service_stats_collection.update_one(
+                {'_id': service_name},
+                {'$inc': {'unsent_logs': -count}}
+            )
+        except PyMongoError as e:
+            logger.warning(f"MongoDB error updating unsent counter: {e}")
+
+    def get_general_statistics(self, hours: int = 24) -> Dict[str, Any]:
+        """Get the per-service summary plus exact totals of the last hours, in one round trip
+
+        A single $facet pipeline over the index-bounded time range counts
+        recent logs and errors per service, with the service_stats counters
+        joined in through $unionWith; only the counts leave the server.
+        """
+        try:
+            collection = self.connection.logs_collection
+            if collection is None:
+                return {}
+
+            end_time = datetime.utcnow()
+            start_time = end_time - timedelta(hours=hours)
+            is_error = {'$cond': [{'$in': ['$log_level', ERROR_LEVELS]}, 1, 0]}
+            recent_only = {'$match': {'summary': {'$exists': False}}}
+
+            pipeline: List[Dict[str, Any]] = [
+                {'$match': {'timestamp': {'$gte': start_time, '$lte': end_time}}},
+                {'$project': {'_id': 0, 'service_name': 1, 'log_level': 1}}
+            ]
+
+            if self._reads_buckets():
+                pipeline.append({'$unionWith': {
+                    'coll': self.connection.config.status_buckets_collection,
+                    'pipeline': bucket_entries_stages(start_time, end_time) + [
+                        {'$project': {'service_name': 1, 'log_level': 1}}
+                    ]
+                }})
+
+            pipeline += [
+                {'$unionWith': {
+                    'coll': self.connection.config.service_stats_collection,
+                    'pipeline': [{'$replaceWith': {'summary': '$$ROOT'}}]
+                }},
+                {'$facet': {
+                    'totals': [
+                        recent_only,
+                        {'$group': {'_id': None, 'logs': {'$sum': 1}, 'errors': {'$sum': is_error}}}
+                    ],
+                    'by_service': [
+                        recent_only,
+                        {'$group': {'_id': '$service_name', 'logs': {'$sum': 1}, 'errors': {'$sum': is_error}}}
+                    ],
+                    'services': [
+                        {'$match': {'summary': {'$exists': True}}},
+                        {'$replaceWith': '$summary'},
+                        {'$sort': {'latest_timestamp': -1}}
+                    ]
+                }}
             ]
 
-            results = list(collection.aggregate(pipeline))
+            facets = next(collection.aggregate(pipeline), {})
+            totals = (facets.get('totals') or [{}])[0]
+            recent = {row['_id']: row for row in facets.get('by_service', [])}
+            services = facets.get('services', [])
+
+            for service in services:
+                counts = recent.get(service['_id'], {})
+                service['recent_logs'] = counts.get('logs', 0)
+                service['recent_errors'] = counts.get('errors', 0)
+
+            return {
+                'period_hours': hours,
+                'total_services': len(services),
+                'total_logs': sum(service.get('total_logs', 0) for service in services),
+                'total_unsent_logs': sum(service.get('unsent_logs', 0) for service in services),
+                'recent_logs': totals.get('logs', 0),
+                'recent_errors': totals.get('errors', 0),
+                'services': services,
+                'last_updated': end_time.isoformat()
+            }
+
+        except PyMongoError as e:
+            logger.error(f"MongoDB error getting general statistics: {e}")
+            return {}
+
+    def get_data_generation(self) -> Optional[str]:
+        """Cheap change marker for caches: the newest log _id
+
+        ObjectIds grow with insertion time, so any new log changes it; the
+        lookup is a single step on the _id index.
+        """
+        try:
+            collection = self.connection.logs_collection
+            if collection is None:
+                return None
+
+            newest = collection.find_one({}, {'_id': 1}, sort=[('_id', -1)])
+            return str(newest['_id']) if newest else None
+
+        except PyMongoError as e:
+            logger.error(f"MongoDB error getting data generation: {e}")
+            return None
+
+    def get_service_summary(self, since: Optional[str] = None) -> Dict[str, Any]:
+        """Get summary of all services and their status
+
+        Reads the incrementally maintained service_stats collection, so the
+        cost grows with the number of services rather than with history.
+
+        since is the sync_token of a previous summary: only services whose
+        status, level, host or type changed after it are returned (counters
+        alone do not mark a change). Tokens trail the query time by a safety
+        lag, so writes committing late are not skipped; a service may be
+        returned twice, compare its version. Raises ValueError for a
+        malformed token.
+        """
+        since_time = decode_sync_token(since) if since else None
+        token_time = datetime.utcnow() - SYNC_SAFETY_LAG
+
+        try:
+            collection = self.connection.service_stats_collection
+            if collection is None:
+                return {}
+
+            query_filter = {'updated_at': {'$gt': since_time}} if since_time else {}
+            results = list(collection.find(query_filter).sort('latest_timestamp', -1))
 
             summary = {
                 'total_services': len(results),
                 'services': results,
-                'last_updated': datetime.utcnow().isoformat()
+                'last_updated': datetime.utcnow().isoformat(),
+                # Never move a token backwards, e.g. when this host's clock is behind
+                'sync_token': encode_sync_token(max(token_time, since_time) if since_time else token_time)
             }
 
             return summary
@@ -347,6 +1537,72 @@ class LogOperations:
             logger.error(f"MongoDB error getting service summary: {e}")
             return {}
 
+    def query_shapes(self) -> List[QueryShape]:
+        """Query shapes issued by this class, for explain-based index verification"""
+        config = self.connection.config
+        now = datetime.utcnow()
+        day_ago = now - timedelta(hours=24)
+        sample_service = 'sample.service'
+        by_time = [('timestamp', -1)]
+        by_position = [('timestamp', -1), ('_id', -1)]
+        page_position = before_position((now, ObjectId()))
+
+        return [
+            QueryShape('logs_by_time', config.logs_collection,
+                       self._build_log_filter(start_time=day_ago, end_time=now), by_position),
+            QueryShape('logs_by_service', config.logs_collection,
+                       self._build_log_filter(service_name=sample_service, start_time=day_ago, end_time=now), by_position),
+            QueryShape('logs_by_level', config.logs_collection,
+                       self._build_log_filter(log_level=LogLevel.ERROR, start_time=day_ago, end_time=now), by_position),
+            QueryShape('logs_by_host', config.logs_collection,
+                       self._build_log_filter(host='localhost', start_time=day_ago, end_time=now), by_position),
+            QueryShape('logs_by_service_and_level', config.logs_collection,
+                       self._build_log_filter(sample_service, LogLevel.ERROR, day_ago, now), by_position),
+            QueryShape('logs_page', config.logs_collection, page_position, by_position),
+            QueryShape('service_logs_page', config.logs_collection,
+                       {'service_name': sample_service, **page_position}, by_position),
+            QueryShape('error_logs', config.logs_collection,
+                       self._error_logs_filter(day_ago, now), by_time),
+            QueryShape('service_statistics', config.logs_collection,
+                       {'service_name': sample_service, 'timestamp': {'$gte': day_ago, '$lt': now}}),
+            QueryShape('unsent_logs', config.logs_collection,
+                       self._unsent_filter(), by_position, hint=UNSENT_INDEX),
+            QueryShape('unsent_logs_by_service_and_level', config.logs_collection,
+                       self._unsent_filter(sample_service, LogLevel.ERROR), by_position, hint=UNSENT_INDEX),
+            QueryShape('unsent_logs_page', config.logs_collection,
+                       {**self._unsent_filter(sample_service, LogLevel.ERROR), **page_position},
+                       by_position, hint=UNSENT_INDEX),
+            QueryShape('claimable_logs', config.logs_collection,
+                       self._claimable_filter(now), [('timestamp', 1)], hint=UNSENT_INDEX),
+            QueryShape('lease_logs', config.logs_collection, {'lease_id': 'sample'}, [('timestamp', 1)]),
+            QueryShape('logs_after_cursor', config.logs_collection,
+                       after_position((day_ago, ObjectId())), [('timestamp', 1), ('_id', 1)]),
+            QueryShape('service_logs_after_cursor', config.logs_collection,
+                       {'service_name': sample_service, **after_position((day_ago, ObjectId()))},
+                       [('timestamp', 1), ('_id', 1)]),
+            QueryShape('events_by_service', config.events_collection,
+                       self._build_event_filter(service_name=sample_service, start_time=day_ago, end_time=now),
+                       [('timestamp', 1)]),
+            QueryShape('events_by_type', config.events_collection,
+                       self._build_event_filter(event_type='service_remediation', start_time=day_ago, end_time=now),
+                       [('timestamp', 1)]),
+            QueryShape('status_checks', config.logs_collection,
+                       status_checks_filter(day_ago, now, sample_service), [('timestamp', 1)]),
+            QueryShape('oldest_log', config.logs_collection, {}, [('timestamp', 1)]),
+            QueryShape('status_buckets_by_service', config.status_buckets_collection,
+                       {'service_name': sample_service, 'bucket_start': {'$gte': day_ago, '$lte': now}},
+                       [('bucket_start', -1)]),
+            QueryShape('hourly_rollups_by_service', config.hourly_rollups_collection,
+                       {'service_name': sample_service, 'bucket': {'$gte': day_ago, '$lt': now}}),
+            QueryShape('daily_rollups_range', config.daily_rollups_collection,
+                       {'bucket': {'$gte': day_ago, '$lt': now}}),
+            QueryShape('service_summary', config.service_stats_collection, {}, [('latest_timestamp', -1)]),
+            QueryShape('services_changed_since', config.service_stats_collection,
+                       {'updated_at': {'$gt': day_ago}}, [('latest_timestamp', -1)]),
+            QueryShape('current_state_by_status', config.current_state_collection,
+                       {'status': ServiceStatus.FAILED.value}, [('_id', 1)])
+        ]
+
     def import_from_file(self, file_path: str, host: str = "localhost") -> int:
         """Import logs from existing log file"""
         imported_count = 0
@@ -0,0 +1,99 @@
+"""
+Keyset pagination over (timestamp, _id) positions, and delta-sync tokens
+
+Pages are walked newest first. A page token encodes the position of the
+last document returned, and the next page starts strictly after it, so
+every page is an index seek plus `limit` documents however deep it is.
+
+Raw logs have ObjectId ids, expanded bucket entries have "<bucket id>:<n>"
+string ids. Positions are ordered by (timestamp, str(_id)), which for
+ObjectIds is the same as their native order.
+"""
+import base64
+import json
+import re
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple, Union
+from bson import ObjectId
+
+Position = Tuple[datetime, Union[ObjectId, str]]
+
+BUCKET_ENTRY_ID = re.compile(r'[0-9a-f]{24}:\d+')
+
+def encode_cursor(document: Dict[str, Any]) -> str:
+    """Build the page token pointing just past a document"""
+    payload = json.dumps({'t': document['timestamp'].isoformat(), 'i': str(document['_id'])})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(token: str) -> Position:
+    """Parse a page token back into a (timestamp, _id) position
+
+    Raises ValueError for malformed tokens, including ids that are neither
+    an ObjectId nor a "<bucket id>:<n>" bucket entry id.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        timestamp = datetime.fromisoformat(payload['t'])
+        log_id = payload['i']
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
+
+    if not isinstance(log_id, str):
+        raise ValueError(f"Invalid cursor: {token}")
+    if ObjectId.is_valid(log_id):
+        return timestamp, ObjectId(log_id)
+    if BUCKET_ENTRY_ID.fullmatch(log_id):
+        return timestamp, log_id
+    raise ValueError(f"Invalid cursor: {token}")
+
+def next_cursor(results: List[Dict[str, Any]], limit: int) -> Optional[str]:
+    """Get the token of the page after results, or None on the last page"""
+    if not results or len(results) < limit:
+        return None
+    return encode_cursor(results[-1])
+
+def sort_key(document: Dict[str, Any]) -> Tuple[datetime, str]:
+    """Position of a raw log or bucket entry, comparable across both layouts"""
+    return document['timestamp'], str(document['_id'])
+
+def before_position(position: Position) -> Dict[str, Any]:
+    """Filter selecting raw logs strictly before a position (the next page, newest first)"""
+    timestamp, log_id = position
+
+    if isinstance(log_id, str):
+        # str(oid) < "<hex>:<n>" exactly when oid <= ObjectId(hex)
+        tie_break = {'$lte': ObjectId(log_id.split(':')[0])}
+    else:
+        tie_break = {'$lt': log_id}
+
+    return {'$or': [
+        {'timestamp': {'$lt': timestamp}},
+        {'timestamp': timestamp, '_id': tie_break}
+    ]}
+
+def after_position(position: Position) -> Dict[str, Any]:
+    """Filter selecting raw logs strictly after a position (oldest first)"""
+    timestamp, log_id = position
+    return {'$or': [
+        {'timestamp': {'$gt': timestamp}},
+        {'timestamp': timestamp, '_id': {'$gt': log_id}}
+    ]}
+
+def encode_sync_token(changed_after: datetime) -> str:
+    """Build an opaque delta-sync token meaning "changed after this time" """
+    payload = str(int(changed_after.replace(tzinfo=timezone.utc).timestamp() * 1000))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_sync_token(token: str) -> datetime:
+    """Parse a delta-sync token back into its (naive UTC) time
+
+    Raises ValueError for malformed tokens.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        millis = int(base64.urlsafe_b64decode(padded.encode()))
+    except Exception as e:
+        raise ValueError(f"Invalid sync token: {token}") from e
+
+    return datetime.fromtimestamp(millis / 1000, tz=timezone.utc).replace(tzinfo=None)
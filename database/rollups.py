@@ -0,0 +1,387 @@
+import bisect
+import logging
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Sequence
+from pymongo.errors import PyMongoError
+from .connection import mongo_connection
+from .models import LogLevel, ServiceStatus
+from .buckets import bucket_entries_stages
+
+logger = logging.getLogger(__name__)
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+LEVELS = [level.value for level in LogLevel]
+STATUSES = [status.value for status in ServiceStatus]
+
+# $dateTrunc aligns bins to this instant when binSize > 1
+BIN_REFERENCE = datetime(2000, 1, 1)
+
+TimeRange = Tuple[datetime, datetime]
+
+def floor_hour(value: datetime) -> datetime:
+    """Truncate a datetime to the start of its hour"""
+    return value.replace(minute=0, second=0, microsecond=0)
+
+def floor_day(value: datetime) -> datetime:
+    """Truncate a datetime to the start of its day"""
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _merge_ranges(ranges: Iterable[TimeRange]) -> List[TimeRange]:
+    """Coalesce adjacent time ranges"""
+    merged: List[TimeRange] = []
+    for range_start, range_end in ranges:
+        if merged and merged[-1][1] == range_start:
+            merged[-1] = (merged[-1][0], range_end)
+        else:
+            merged.append((range_start, range_end))
+    return merged
+
+def plan_segments(
+    start: datetime,
+    end: datetime,
+    boundaries: Iterable[datetime] = (),
+    hourly_until: Optional[datetime] = None,
+    daily_until: Optional[datetime] = None
+) -> Dict[str, List[TimeRange]]:
+    """Split [start, end) into the cheapest sources that answer it exactly
+
+    Whole days already rolled up come from daily rollups, whole hours from
+    hourly rollups, and everything else (the recent edge and partial hours)
+    from raw logs. A rollup bucket is only used when no boundary falls
+    strictly inside it, so conditional sums per window stay exact.
+    """
+    boundaries = sorted(set(boundaries))
+    plan: Dict[str, List[TimeRange]] = {'raw': [], 'hourly': [], 'daily': []}
+
+    def splits(bucket_start: datetime, size: timedelta) -> bool:
+        # First boundary after bucket_start, boundaries can number in the thousands
+        index = bisect.bisect_right(boundaries, bucket_start)
+        return index < len(boundaries) and boundaries[index] < bucket_start + size
+
+    rolled_end = min(end, hourly_until) if hourly_until else start
+    full_hours: List[datetime] = []
+    hour = floor_hour(start)
+
+    while hour < rolled_end:
+        segment = (max(hour, start), min(hour + HOUR, rolled_end))
+        if segment == (hour, hour + HOUR) and not splits(hour, HOUR):
+            full_hours.append(hour)
+        else:
+            plan['raw'].append(segment)
+        hour += HOUR
+
+    # Promote complete days of eligible hours to daily rollups
+    hours_by_day: Dict[datetime, List[datetime]] = {}
+    for hour in full_hours:
+        hours_by_day.setdefault(floor_day(hour), []).append(hour)
+
+    for day, hours in hours_by_day.items():
+        if (daily_until and day + DAY <= daily_until and len(hours) == 24
+                and not splits(day, DAY)):
+            plan['daily'].append((day, day + DAY))
+        else:
+            plan['hourly'].extend((hour, hour + HOUR) for hour in hours)
+
+    if rolled_end < end:
+        plan['raw'].append((max(rolled_end, start), end))
+
+    return {source: _merge_ranges(sorted(ranges)) for source, ranges in plan.items()}
+
+def ranges_filter(field: str, ranges: List[TimeRange]) -> Dict[str, Any]:
+    """Build a $match filter selecting documents whose field lies in any range"""
+    clauses = [{field: {'$gte': range_start, '$lt': range_end}} for range_start, range_end in ranges]
+    return clauses[0] if len(clauses) == 1 else {'$or': clauses}
+
+def window_index(from_rollups: bool, window_starts: Sequence[datetime]) -> Dict[str, Any]:
+    """Group key: index of the narrowest window holding a document
+
+    window_starts are ordered narrowest first and all windows end at the
+    same time, so a window's totals are the sum of its group and every
+    narrower one.
+    """
+    time_field = '$bucket' if from_rollups else '$timestamp'
+    return {'$switch': {
+        'branches': [{'case': {'$gte': [time_field, window_start]}, 'then': index}
+                     for index, window_start in enumerate(window_starts)],
+        'default': len(window_starts)
+    }}
+
+def floor_bin(value: datetime, size: timedelta) -> datetime:
+    """Start of the fixed-size bin holding value, aligned like $dateTrunc"""
+    return BIN_REFERENCE + ((value - BIN_REFERENCE) // size) * size
+
+def time_bin(from_rollups: bool, size: timedelta) -> Dict[str, Any]:
+    """Group key: start of the fixed-size time bin holding a document"""
+    return {'$dateTrunc': {
+        'date': '$bucket' if from_rollups else '$timestamp',
+        'unit': 'minute',
+        'binSize': int(size.total_seconds() // 60)
+    }}
+
+def counts_group(from_rollups: bool, group_id: Any = None) -> Dict[str, Any]:
+    """$group stage totalling logs by level and status over raw logs or rollups"""
+    group: Dict[str, Any] = {
+        '_id': group_id,
+        'count': {'$sum': '$count' if from_rollups else 1},
+        'latest': {'$max': '$last_timestamp' if from_rollups else '$timestamp'}
+    }
+    for level in LEVELS:
+        group[f'level_{level}'] = {'$sum': f'$levels.{level}' if from_rollups else
+                                   {'$cond': [{'$eq': ['$log_level', level]}, 1, 0]}}
+    for status in STATUSES:
+        group[f'status_{status}'] = {'$sum': f'$statuses.{status}' if from_rollups else
+                                     {'$cond': [{'$eq': ['$status', status]}, 1, 0]}}
+    return {'$group': group}
+
+class LogRollups:
+    """Hierarchical downsampling of raw logs into hourly and daily rollups
+
+    Rollup documents hold, per service and bucket, the number of logs,
+    counts by level and status, first/last timestamps and statuses, and the
+    number of status transitions.
+    """
+
+    def __init__(self):
+        self.connection = mongo_connection
+
+    def _get_watermark(self, name: str) -> Optional[datetime]:
+        """Get the end of the range already rolled up at a given granularity"""
+        collection = self.connection.rollup_state_collection
+        if collection is None:
+            return None
+
+        state = collection.find_one({'_id': name})
+        return state['rolled_up_to'] if state else None
+
+    def _set_watermark(self, name: str, value: datetime):
+        """Persist the end of the rolled up range"""
+        self.connection.rollup_state_collection.update_one(
+            {'_id': name},
+            {'$set': {'rolled_up_to': value, 'updated_at': datetime.utcnow()}},
+            upsert=True
+        )
+
+    def get_watermarks(self) -> Dict[str, Optional[datetime]]:
+        """Get hourly and daily rollup watermarks"""
+        return {
+            'hourly': self._get_watermark('hourly'),
+            'daily': self._get_watermark('daily')
+        }
+
+    def _hourly_pipeline(self, range_start: datetime, range_end: datetime) -> List[Dict[str, Any]]:
+        """Aggregation compacting raw logs of [range_start, range_end) into hourly buckets"""
+        has_status = {'$gt': ['$status', None]}
+
+        group: Dict[str, Any] = {
+            '_id': {
+                'service_name': '$service_name',
+                'bucket': {'$dateTrunc': {'date': '$timestamp', 'unit': 'hour'}}
+            },
+            'count': {'$sum': 1},
+            'first_timestamp': {'$min': '$timestamp'},
+            'last_timestamp': {'$max': '$timestamp'},
+            # $min/$max skip nulls, so only status checks take part
+            'first_state': {'$min': {'$cond': [has_status, {'t': '$timestamp', 's': '$status'}, None]}},
+            'last_state': {'$max': {'$cond': [has_status, {'t': '$timestamp', 's': '$status'}, None]}},
+            'transitions': {'$sum': {'$cond': [
+                {'$and': [has_status, {'$gt': ['$prev_status', None]}, {'$ne': ['$status', '$prev_status']}]},
+                1, 0
+            ]}},
+            'hosts': {'$addToSet': '$host'}
+        }
+        for level in LEVELS:
+            group[f'level_{level}'] = {'$sum': {'$cond': [{'$eq': ['$log_level', level]}, 1, 0]}}
+        for status in STATUSES:
+            group[f'status_{status}'] = {'$sum': {'$cond': [{'$eq': ['$status', status]}, 1, 0]}}
+
+        pipeline: List[Dict[str, Any]] = [
+            # Look back one hour so transitions across the range start are detected
+            {'$match': {'timestamp': {'$gte': range_start - HOUR, '$lt': range_end}}}
+        ]
+        if self.connection.config.bucket_status_checks:
+            pipeline.append({'$unionWith': {
+                'coll': self.connection.config.status_buckets_collection,
+                'pipeline': bucket_entries_stages(range_start - HOUR, range_end)
+            }})
+
+        return pipeline + [
+            {
+                '$setWindowFields': {
+                    'partitionBy': {'service_key': '$service_key', 'has_status': has_status},
+                    'sortBy': {'timestamp': 1},
+                    'output': {'prev_status': {'$shift': {'output': '$status', 'by': -1}}}
+                }
+            },
+            {'$match': {'timestamp': {'$gte': range_start}}},
+            {'$group': group},
+            {
+                '$project': {
+                    '_id': 0,
+                    'service_name': '$_id.service_name',
+                    'bucket': '$_id.bucket',
+                    'count': 1,
+                    'levels': {level: f'$level_{level}' for level in LEVELS},
+                    'statuses': {status: f'$status_{status}' for status in STATUSES},
+                    'first_timestamp': 1,
+                    'last_timestamp': 1,
+                    'first_status': '$first_state.s',
+                    'last_status': '$last_state.s',
+                    'transitions': 1,
+                    'hosts': 1,
+                    'rolled_up_at': '$$NOW'
+                }
+            },
+            {
+                '$merge': {
+                    'into': self.connection.config.hourly_rollups_collection,
+                    'on': ['service_name', 'bucket'],
+                    'whenMatched': 'replace',
+                    'whenNotMatched': 'insert'
+                }
+            }
+        ]
+
+    def _daily_pipeline(self, range_start: datetime, range_end: datetime) -> List[Dict[str, Any]]:
+        """Aggregation compacting hourly rollups of [range_start, range_end) into daily buckets"""
+        group: Dict[str, Any] = {
+            '_id': {
+                'service_name': '$service_name',
+                'bucket': {'$dateTrunc': {'date': '$bucket', 'unit': 'day'}}
+            },
+            'count': {'$sum': '$count'},
+            'first_timestamp': {'$min': '$first_timestamp'},
+            'last_timestamp': {'$max': '$last_timestamp'},
+            'first_state': {'$min': {'$cond': [
+                {'$gt': ['$first_status', None]}, {'t': '$bucket', 's': '$first_status'}, None
+            ]}},
+            'last_state': {'$max': {'$cond': [
+                {'$gt': ['$last_status', None]}, {'t': '$bucket', 's': '$last_status'}, None
+            ]}},
+            # Hourly transitions already include the ones crossing hour boundaries
+            'transitions': {'$sum': '$transitions'},
+            'hosts': {'$push': '$hosts'}
+        }
+        for level in LEVELS:
+            group[f'level_{level}'] = {'$sum': f'$levels.{level}'}
+        for status in STATUSES:
+            group[f'status_{status}'] = {'$sum': f'$statuses.{status}'}
+
+        return [
+            {'$match': {'bucket': {'$gte': range_start, '$lt': range_end}}},
+            {'$group': group},
+            {
+                '$project': {
+                    '_id': 0,
+                    'service_name': '$_id.service_name',
+                    'bucket': '$_id.bucket',
+                    'count': 1,
+                    'levels': {level: f'$level_{level}' for level in LEVELS},
+                    'statuses': {status: f'$status_{status}' for status in STATUSES},
+                    'first_timestamp': 1,
+                    'last_timestamp': 1,
+                    'first_status': '$first_state.s',
+                    'last_status': '$last_state.s',
+                    'transitions': 1,
+                    'hosts': {'$reduce': {
+                        'input': '$hosts', 'initialValue': [], 'in': {'$setUnion': ['$$value', '$$this']}
+                    }},
+                    'rolled_up_at': '$$NOW'
+                }
+            },
+            {
+                '$merge': {
+                    'into': self.connection.config.daily_rollups_collection,
+                    'on': ['service_name', 'bucket'],
+                    'whenMatched': 'replace',
+                    'whenNotMatched': 'insert'
+                }
+            }
+        ]
+
+    def rollup_hourly(self, until: Optional[datetime] = None, chunk_hours: int = 24) -> int:
+        """Roll raw logs up into hourly buckets, resuming from the hourly watermark
+
+        Returns the number of hours processed.
+        """
+        try:
+            logs_collection = self.connection.logs_collection
+            if logs_collection is None:
+                logger.error("Logs collection not available")
+                return 0
+
+            cutoff = datetime.utcnow() - timedelta(hours=self.connection.config.rollup_after_hours)
+            until = floor_hour(min(until or cutoff, cutoff))
+
+            start = self._get_watermark('hourly')
+            if start is None:
+                oldest = logs_collection.find_one({}, {'timestamp': 1}, sort=[('timestamp', 1)])
+                if oldest is None:
+                    return 0
+                start = floor_hour(oldest['timestamp'])
+
+            processed = 0
+            while start < until:
+                chunk_end = min(start + timedelta(hours=chunk_hours), until)
+                list(logs_collection.aggregate(self._hourly_pipeline(start, chunk_end), allowDiskUse=True))
+                self._set_watermark('hourly', chunk_end)
+
+                processed += int((chunk_end - start) / HOUR)
+                start = chunk_end
+
+            logger.info(f"Rolled up {processed} hours of raw logs into hourly buckets")
+            return processed
+
+        except PyMongoError as e:
+            logger.error(f"MongoDB error rolling up hourly logs: {e}")
+            return 0
+
+    def rollup_daily(self, chunk_days: int = 31) -> int:
+        """Roll complete days of hourly buckets up into daily buckets
+
+        Returns the number of days processed.
+        """
+        try:
+            hourly_collection = self.connection.hourly_rollups_collection
+            if hourly_collection is None:
+                logger.error("Hourly rollups collection not available")
+                return 0
+
+            hourly_until = self._get_watermark('hourly')
+            if hourly_until is None:
+                return 0
+            until = floor_day(hourly_until)
+
+            start = self._get_watermark('daily')
+            if start is None:
+                oldest = hourly_collection.find_one({}, {'bucket': 1}, sort=[('bucket', 1)])
+                if oldest is None:
+                    return 0
+                start = floor_day(oldest['bucket'])
+
+            processed = 0
+            while start < until:
+                chunk_end = min(start + timedelta(days=chunk_days), until)
+                list(hourly_collection.aggregate(self._daily_pipeline(start, chunk_end), allowDiskUse=True))
+                self._set_watermark('daily', chunk_end)
+
+                processed += (chunk_end - start).days
+                start = chunk_end
+
+            logger.info(f"Rolled up {processed} days of hourly buckets into daily buckets")
+            return processed
+
+        except PyMongoError as e:
+            logger.error(f"MongoDB error rolling up daily logs: {e}")
+            return 0
+
+    def run(self) -> Dict[str, int]:
+        """Run the whole rollup hierarchy"""
+        return {
+            'hours': self.rollup_hourly(),
+            'days': self.rollup_daily()
+        }
+
+# Global rollups instance
+log_rollups = LogRollups()
@@ -0,0 +1,222 @@
+"""
+Uptime and SLA reports from status checks
+
+MongoDB reduces the status checks of a time range to the rows where
+something happened (a status change, a monitoring gap, the last check of
+each service_key); NumPy turns those rows into state intervals and sums
+them per service with vectorized interval arithmetic.
+
+A check is assumed to describe the service until the next check, for at
+most max_gap seconds; time not covered by any check is unknown and is
+left out of availability (see 'coverage').
+
+Definitions:
+- availability: up time / (up time + down time), in percent
+- outage: a run of consecutive inactive/failed intervals
+- MTTR: down time / outages, MTBF: up time / outages
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+
+from pymongo.errors import PyMongoError
+
+from .connection import mongo_connection
+from .buckets import bucket_entries_stages
+from .models import ServiceStatus
+
+try:
+    import numpy as np
+except ImportError:  # Only uptime reports need numpy, the monitor does not
+    np = None
+
+logger = logging.getLogger(__name__)
+
+UP_STATUSES = [ServiceStatus.ACTIVE.value]
+DOWN_STATUSES = [ServiceStatus.INACTIVE.value, ServiceStatus.FAILED.value]
+
+def status_checks_filter(start_time: datetime, end_time: datetime, service_name: Optional[str] = None) -> Dict[str, Any]:
+    """Build the filter selecting status checks in a time range"""
+    query_filter: Dict[str, Any] = {
+        'status': {'$in': [status.value for status in ServiceStatus]},
+        'timestamp': {'$gte': start_time, '$lt': end_time}
+    }
+    if service_name:
+        query_filter['service_name'] = service_name
+    return query_filter
+
+def compute_uptime(
+    keys: "np.ndarray",
+    timestamps: "np.ndarray",
+    statuses: "np.ndarray",
+    previous: "np.ndarray",
+    start_ms: int,
+    end_ms: int,
+    max_gap_ms: int,
+    key_count: int
+) -> Dict[str, "np.ndarray"]:
+    """Per-key up/down/unknown time and outage counts from transition rows
+
+    Rows are sorted by key then timestamp (epoch milliseconds). previous is
+    the timestamp of the check before each row, used to detect gaps.
+    Returns arrays indexed by key.
+    """
+    count = len(timestamps)
+    same_next = np.zeros(count, dtype=bool)
+    same_next[:-1] = keys[1:] == keys[:-1]
+
+    next_timestamps = np.roll(timestamps, -1)
+    next_previous = np.roll(previous, -1)
+    gap_next = same_next & (next_timestamps - next_previous > max_gap_ms)
+
+    # A state lasts until the next row, or max_gap after its last check when a gap follows
+    interval_end = np.where(
+        same_next,
+        np.where(gap_next, next_previous + max_gap_ms, next_timestamps),
+        timestamps + max_gap_ms
+    )
+    duration = np.clip(np.minimum(interval_end, end_ms) - np.maximum(timestamps, start_ms), 0, None)
+
+    is_up = np.isin(statuses, UP_STATUSES)
+    is_down = np.isin(statuses, DOWN_STATUSES)
+
+    up = np.bincount(keys, weights=duration * is_up, minlength=key_count)
+    down = np.bincount(keys, weights=duration * is_down, minlength=key_count)
+    observed = np.bincount(keys, weights=duration, minlength=key_count)
+
+    # Outages are runs of down rows; only runs with down time inside the range count
+    same_previous = np.zeros(count, dtype=bool)
+    same_previous[1:] = same_next[:-1]
+    previous_down = np.roll(is_down, 1)
+    run_start = is_down & ~(same_previous & previous_down)
+    run_ids = np.cumsum(run_start) - 1
+    run_down = np.bincount(run_ids[is_down], weights=duration[is_down], minlength=int(run_start.sum()))
+    outages = np.bincount(keys[run_start], weights=run_down > 0, minlength=key_count)
+
+    return {'up': up, 'down': down, 'observed': observed, 'outages': outages}
+
+class UptimeReports:
+    """Availability, outages, MTTR and MTBF per service_key over any time range"""
+
+    def __init__(self):
+        self.connection = mongo_connection
+
+    def _transitions_pipeline(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        max_gap: timedelta,
+        service_name: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Aggregation reducing status checks to transition, gap and last-check rows"""
+        # Checks up to max_gap before the range tell the state at its start
+        lookback_start = start_time - max_gap
+        pipeline: List[Dict[str, Any]] = [{'$match': status_checks_filter(lookback_start, end_time, service_name)}]
+
+        if self.connection.config.bucket_status_checks:
+            pipeline.append({'$unionWith': {
+                'coll': self.connection.config.status_buckets_collection,
+                'pipeline': bucket_entries_stages(lookback_start, end_time, service_name=service_name)
+            }})
+
+        return pipeline + [
+            {'$project': {'_id': 0, 'service_key': 1, 'service_name': 1, 'host': 1, 'timestamp': 1, 'status': 1}},
+            {
+                '$setWindowFields': {
+                    'partitionBy': '$service_key',
+                    'sortBy': {'timestamp': 1},
+                    'output': {
+                        'prev_status': {'$shift': {'output': '$status', 'by': -1}},
+                        'prev_timestamp': {'$shift': {'output': '$timestamp', 'by': -1}},
+                        'next_timestamp': {'$shift': {'output': '$timestamp', 'by': 1}}
+                    }
+                }
+            },
+            {'$match': {'$expr': {'$or': [
+                {'$ne': ['$status', '$prev_status']},
+                {'$eq': ['$next_timestamp', None]},
+                {'$gt': [{'$subtract': ['$timestamp', '$prev_timestamp']}, int(max_gap.total_seconds() * 1000)]}
+            ]}}},
+            {'$sort': {'service_key': 1, 'timestamp': 1}},
+            {'$project': {
+                'k': '$service_key', 'n': '$service_name', 'h': '$host',
+                't': '$timestamp', 's': '$status', 'p': {'$ifNull': ['$prev_timestamp', '$timestamp']}
+            }}
+        ]
+
+    def get_uptime(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        service_name: Optional[str] = None,
+        max_gap: Optional[timedelta] = None
+    ) -> List[Dict[str, Any]]:
+        """Compute uptime figures per service_key, worst availability first"""
+        if np is None:
+            raise RuntimeError("Uptime reports require numpy (pip install numpy)")
+
+        max_gap = max_gap or timedelta(seconds=self.connection.config.uptime_max_gap_seconds)
+
+        try:
+            collection = self.connection.logs_collection
+            if collection is None:
+                logger.error("Logs collection not available")
+                return []
+
+            rows = list(collection.aggregate(
+                self._transitions_pipeline(start_time, end_time, max_gap, service_name),
+                allowDiskUse=True
+            ))
+
+        except PyMongoError as e:
+            logger.error(f"MongoDB error reading status transitions: {e}")
+            return []
+
+        if not rows:
+            return []
+
+        def as_ms(values: List[datetime]) -> "np.ndarray":
+            return np.array(values, dtype='datetime64[ms]').astype(np.int64)
+
+        service_keys, keys = np.unique(np.array([row['k'] for row in rows], dtype=object), return_inverse=True)
+
+        figures = compute_uptime(
+            keys,
+            as_ms([row['t'] for row in rows]),
+            np.array([row['s'] for row in rows], dtype=object),
+            as_ms([row['p'] for row in rows]),
+            int(as_ms([start_time])[0]),
+            int(as_ms([end_time])[0]),
+            int(max_gap.total_seconds() * 1000),
+            len(service_keys)
+        )
+
+        names = {row['k']: (row.get('n'), row.get('h')) for row in rows}
+        range_seconds = (end_time - start_time).total_seconds()
+        report = []
+
+        for index, service_key in enumerate(service_keys):
+            up = figures['up'][index] / 1000
+            down = figures['down'][index] / 1000
+            outages = int(figures['outages'][index])
+            name, host = names[service_key]
+
+            report.append({
+                'service_key': service_key,
+                'service_name': name,
+                'host': host,
+                'availability': round(100 * up / (up + down), 4) if up + down else None,
+                'coverage': round(100 * figures['observed'][index] / 1000 / range_seconds, 4),
+                'uptime_seconds': round(up, 3),
+                'downtime_seconds': round(down, 3),
+                'outages': outages,
+                'mttr_seconds': round(down / outages, 3) if outages else None,
+                'mtbf_seconds': round(up / outages, 3) if outages else None
+            })
+
+        report.sort(key=lambda item: (item['availability'] is None, item['availability'] or 0))
+        return report
+
+# Global uptime reports instance
+uptime_reports = UptimeReports()
@@ -95,7 +95,12 @@ class ConfigLoader:
                 "enabled": True,
                 "host": "localhost",
                 "port": 27017,
-                "database": "service_monitoring"
+                "database": "service_monitoring",
+                "bucket_status_checks": False,
+                "retention": {
+                    "logs": {"DEBUG": 3, "INFO": 7, "WARNING": 30, "ERROR": 90, "CRITICAL": 90},
+                    "events": {"*": 90}
+                }
             },
             "targets": [
                 {
@@ -8,7 +8,7 @@ from datetime import datetime
 # Add parent directory to path for database imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from database import log_operations, LogEntry, EventEntry, LogLevel, ServiceStatus as MongoServiceStatus
+from database import log_operations, LogEntry, EventEntry, LogLevel, MongoConfig, ServiceStatus as MongoServiceStatus
 
 class LoggerManager:
     """Unified logging manager with MongoDB integration"""
@@ -74,6 +74,20 @@ class LoggerManager:
             if "password" in self.mongodb_config:
                 os.environ["MONGO_PASSWORD"] = self.mongodb_config["password"]
 
+            if "bucket_status_checks" in self.mongodb_config:
+                os.environ["MONGO_BUCKET_STATUS_CHECKS"] = str(self.mongodb_config["bucket_status_checks"]).lower()
+
+            # Retention per collection and level, e.g. {"logs": {"INFO": 7, "ERROR": 90}}
+            retention = self.mongodb_config.get("retention", {})
+            for collection, env_var in (("logs", "MONGO_LOGS_RETENTION_DAYS"), ("events", "MONGO_EVENTS_RETENTION_DAYS")):
+                if collection in retention:
+                    os.environ[env_var] = ",".join(
+                        f"{level}={days}" for level, days in retention[collection].items()
+                    )
+
+            # The connection singleton read the environment at import time, reload it
+            log_operations.connection.config = MongoConfig()
+
             # Test MongoDB connection
             if log_operations.connection.connect():
                 self.logger.info("MongoDB logging enabled and connected")
@@ -131,7 +145,7 @@ class LoggerManager:
                     metadata=metadata or {'original_status': status},
                     tags=[target_name, 'status_check']
                 )
-                log_operations.save_log(log_entry)
+                log_operations.save_status_check(log_entry)
             except Exception as e:
                 self.logger.error(f"Failed to save status log to MongoDB: {e}")
 
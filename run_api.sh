@@ -29,7 +29,7 @@ echo "🚀 Starting Service Monitor API..."
 echo "📁 Project root: $SCRIPT_DIR"
 echo "🐍 Using virtual environment: $VENV_PATH"
 
-# Default values
+# Default values (extra arguments go to main.py, e.g. --workers 4 for production)
 HOST=${1:-"0.0.0.0"}
 PORT=${2:-"8000"}
 
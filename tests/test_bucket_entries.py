@@ -0,0 +1,105 @@
+"""
+Bucketed status check ordering tests
+
+Run without MongoDB: the logs and status_buckets collections are replaced
+by in-memory fakes that only sort, so every filtering and ordering
+decision under test is made by LogOperations itself.
+
+    python -m pytest tests/
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+from bson import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import log_operations
+from database.buckets import STATUS_CODES
+from database.pagination import next_cursor, sort_key
+
+BUCKET_START = datetime(2025, 9, 26, 7, 0, 0)
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = list(documents)
+
+    def sort(self, key, direction=1):
+        keys = key if isinstance(key, list) else [(key, direction)]
+        for field, field_direction in reversed(keys):
+            self.documents.sort(key=lambda doc: doc[field], reverse=field_direction == -1)
+        return self
+
+    def limit(self, count):
+        return self
+
+    def skip(self, count):
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    def __iter__(self):
+        return iter(self.documents)
+
+class FakeCollection:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, *args, **kwargs):
+        return FakeCursor(self.documents)
+
+def bucket(service: str, checks: int) -> dict:
+    """One hour of steady checks, ten minutes apart"""
+    return {
+        '_id': ObjectId(),
+        'service_key': f"localhost:{service}",
+        'bucket_start': BUCKET_START,
+        'service_name': service,
+        'service_type': 'local',
+        'host': 'localhost',
+        'count': checks,
+        'offsets': [i * 10 * 60 * 1000 for i in range(checks)],
+        'codes': [STATUS_CODES.index('active')] * checks,
+        'messages': {'0': f"[{service}] status=active"}
+    }
+
+@pytest.fixture
+def two_services_bucketed(monkeypatch):
+    """Two service_keys with a bucket for the same hour, and no raw logs"""
+    buckets = FakeCollection([bucket('a.service', 6), bucket('b.service', 6)])
+    connection = type(log_operations.connection)
+
+    monkeypatch.setattr(log_operations.connection.config, 'bucket_status_checks', True)
+    with mock.patch.object(connection, 'logs_collection', new_callable=mock.PropertyMock,
+                           return_value=FakeCollection([])), \
+         mock.patch.object(connection, 'status_buckets_collection', new_callable=mock.PropertyMock,
+                           return_value=buckets):
+        yield
+
+def test_get_logs_pages_through_every_bucket_in_order(two_services_bucketed):
+    pages, cursor = [], None
+    while True:
+        page = log_operations.get_logs(start_time=BUCKET_START, limit=4, cursor=cursor)
+        pages.append(page)
+        cursor = next_cursor(page, 4)
+        if cursor is None:
+            break
+
+    logs = [log for page in pages for log in page]
+
+    assert len(logs) == 12
+    assert len({log['_id'] for log in logs}) == 12
+    assert logs == sorted(logs, key=sort_key, reverse=True)
+    # The newest checks of both services share the first page
+    assert {log['service_name'] for log in pages[0]} == {'a.service', 'b.service'}
+
+def test_iter_logs_is_oldest_first_across_services(two_services_bucketed):
+    logs = list(log_operations.iter_logs(start_time=BUCKET_START, end_time=BUCKET_START + timedelta(hours=1)))
+
+    assert len(logs) == 12
+    assert logs == sorted(logs, key=sort_key)
@@ -0,0 +1,58 @@
+"""
+Export streaming tests
+
+Run without MongoDB: the logs collection is replaced by a mock whose
+cursor fails partway through.
+
+    python -m pytest tests/
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import AutoReconnect
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import main
+from database import log_operations
+
+def failing_cursor(documents: int):
+    """A cursor yielding some logs, then losing its connection"""
+    start = datetime(2025, 9, 26, 7, 0, 0)
+    for i in range(documents):
+        yield {
+            '_id': ObjectId(),
+            'service_name': 'nginx.service',
+            'log_level': 'INFO',
+            'message': f"check {i}",
+            'timestamp': start + timedelta(seconds=i)
+        }
+    raise AutoReconnect("connection closed")
+
+async def read_body(response) -> bytes:
+    chunks = []
+    async for chunk in response.body_iterator:
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+def test_export_aborts_when_the_cursor_fails_midway():
+    collection = mock.Mock()
+    collection.find.return_value.sort.return_value.batch_size.return_value = failing_cursor(5)
+    connection = type(log_operations.connection)
+
+    with mock.patch.object(connection, 'logs_collection', new_callable=mock.PropertyMock, return_value=collection):
+        response = asyncio.run(main.export_logs(
+            service_name=None, log_level=None, host=None,
+            start_time=None, end_time=None,
+            format='ndjson', gzip=False, batch_size=2
+        ))
+
+        # A well-formed but truncated download would look like a successful export
+        with pytest.raises(AutoReconnect):
+            asyncio.run(read_body(response))
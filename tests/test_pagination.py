@@ -0,0 +1,65 @@
+"""
+Page token tests
+
+Run without MongoDB: tokens and position filters are plain data.
+
+    python -m pytest tests/
+"""
+
+import base64
+import json
+import os
+import sys
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.pagination import after_position, before_position, decode_cursor, encode_cursor
+
+TIMESTAMP = datetime(2025, 9, 26, 7, 0, 0)
+
+def token(payload) -> str:
+    """Encode an arbitrary payload the way encode_cursor does"""
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+def test_decode_cursor_round_trips_log_ids():
+    oid = ObjectId()
+    assert decode_cursor(encode_cursor({'timestamp': TIMESTAMP, '_id': oid})) == (TIMESTAMP, oid)
+
+def test_decode_cursor_round_trips_bucket_entry_ids():
+    entry_id = f"{ObjectId()}:000003"
+    assert decode_cursor(encode_cursor({'timestamp': TIMESTAMP, '_id': entry_id})) == (TIMESTAMP, entry_id)
+
+@pytest.mark.parametrize("log_id", ["x:1", "not-an-id", f"{ObjectId()}:", f"{ObjectId()}:1:2", 42, None])
+def test_decode_cursor_rejects_crafted_ids(log_id):
+    with pytest.raises(ValueError):
+        decode_cursor(token({'t': TIMESTAMP.isoformat(), 'i': log_id}))
+
+@pytest.mark.parametrize("value", ["", "garbage", token({'t': 'yesterday', 'i': str(ObjectId())}), token([1, 2])])
+def test_decode_cursor_rejects_malformed_tokens(value):
+    with pytest.raises(ValueError):
+        decode_cursor(value)
+
+def test_before_position_with_log_id():
+    oid = ObjectId()
+    assert before_position((TIMESTAMP, oid)) == {'$or': [
+        {'timestamp': {'$lt': TIMESTAMP}},
+        {'timestamp': TIMESTAMP, '_id': {'$lt': oid}}
+    ]}
+
+def test_before_position_with_bucket_entry_id():
+    oid = ObjectId()
+    assert before_position((TIMESTAMP, f"{oid}:000003")) == {'$or': [
+        {'timestamp': {'$lt': TIMESTAMP}},
+        {'timestamp': TIMESTAMP, '_id': {'$lte': oid}}
+    ]}
+
+def test_after_position():
+    oid = ObjectId()
+    assert after_position((TIMESTAMP, oid)) == {'$or': [
+        {'timestamp': {'$gt': TIMESTAMP}},
+        {'timestamp': TIMESTAMP, '_id': {'$gt': oid}}
+    ]}
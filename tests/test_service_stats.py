@@ -0,0 +1,80 @@
+"""
+Service stats tests
+
+Need a MongoDB server (MONGO_HOST / MONGO_PORT, 4.4+ for $unionWith) and
+are skipped without one. They run in a throwaway database.
+
+    python -m pytest tests/
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import LogEntry, LogLevel, MongoConfig, ServiceStatus, log_operations, mongo_connection
+
+@pytest.fixture
+def bucketed_database(monkeypatch):
+    """Connect to a throwaway database with status check bucketing enabled"""
+    monkeypatch.setenv('MONGO_DB_NAME', f"service_monitoring_test_{os.getpid()}")
+    monkeypatch.setenv('MONGO_BUCKET_STATUS_CHECKS', 'true')
+    config = MongoConfig()
+
+    try:
+        MongoClient(config.connection_string, serverSelectionTimeoutMS=1000).server_info()
+    except PyMongoError as e:
+        pytest.skip(f"MongoDB not available: {e}")
+
+    mongo_connection.disconnect()
+    mongo_connection.config = config
+    assert mongo_connection.connect()
+
+    yield mongo_connection
+
+    mongo_connection._client.drop_database(config.database_name)
+    mongo_connection.disconnect()
+
+def status_check(timestamp: datetime, status: ServiceStatus, level: LogLevel = LogLevel.INFO) -> LogEntry:
+    return LogEntry(
+        service_name="nginx.service",
+        log_level=level,
+        message=f"[local-nginx] status={status.value}",
+        timestamp=timestamp,
+        service_type="local",
+        host="localhost",
+        status=status
+    )
+
+def stats_without_markers(connection):
+    """Service stats as comparable dicts, without the delta sync markers"""
+    return {
+        doc['_id']: {k: v for k, v in doc.items() if k not in ('version', 'updated_at')}
+        for doc in connection.service_stats_collection.find()
+    }
+
+def test_rebuild_matches_live_counters_with_bucketed_checks(bucketed_database):
+    start = datetime(2025, 9, 26, 7, 0, 0)
+    checks = [status_check(start + timedelta(minutes=i), ServiceStatus.ACTIVE) for i in range(5)]
+    checks.append(status_check(start + timedelta(minutes=5), ServiceStatus.FAILED, LogLevel.ERROR))
+    checks += [status_check(start + timedelta(minutes=6 + i), ServiceStatus.ACTIVE) for i in range(3)]
+
+    for check in checks:
+        assert log_operations.save_status_check(check)
+
+    # Steady checks must have gone to buckets, or this test proves nothing
+    assert bucketed_database.status_buckets_collection.count_documents({}) > 0
+
+    live = stats_without_markers(bucketed_database)
+    assert live['nginx.service']['total_logs'] == len(checks)
+
+    assert log_operations.rebuild_service_stats() == 1
+    rebuilt = stats_without_markers(bucketed_database)
+
+    assert rebuilt == live
+    assert rebuilt['nginx.service']['latest_status'] == ServiceStatus.ACTIVE.value